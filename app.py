@@ -1,10 +1,8 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
-import numpy as np
+
+# NumPy, pandas, Plotly and yfinance are imported by the code paths that draw
+# charts, so the sidebar and welcome screen render without loading them
+from choices import CHART_TYPES, DEFAULT_MAX_POINTS, INTERVALS, PRESETS
 
 # Page configuration
 st.set_page_config(
@@ -50,10 +48,28 @@ with st.sidebar:
         
         chart_type = st.selectbox(
             "Chart Type",
-            ["Candlestick", "Line Chart", "OHLC"],
+            CHART_TYPES,
             index=0
         )
         
+        # Daily bars are aggregated locally, other intervals need no extra download
+        interval_label = st.selectbox("Bar Interval", list(INTERVALS) + ["Custom"], index=0)
+        if interval_label == "Custom":
+            interval = int(st.number_input("Trading Days per Bar", min_value=2, value=5, step=1))
+        else:
+            interval = interval_label
+        
+        indicator_labels = st.multiselect("Indicators", list(PRESETS), default=[])
+        
+        live = st.toggle("Live Updates", value=False, help="Poll for new bars and update the charts in place")
+        refresh_seconds = st.number_input(
+            "Refresh Every (seconds)",
+            min_value=5,
+            value=60,
+            step=5,
+            disabled=not live
+        )
+        
     else:
         # Multi-symbol comparison
         symbols_input = st.text_area(
@@ -79,358 +95,291 @@ with st.sidebar:
         
         period_label = st.selectbox("Time Period", list(period_options.keys()), index=3)
         period = period_options[period_label]
+    
+    # Long series are thinned out before drawing, zooming in restores detail
+    max_points = st.number_input(
+        "Max Points per Series",
+        min_value=0,
+        value=DEFAULT_MAX_POINTS,
+        step=100,
+        help="Series longer than this are downsampled before drawing, 0 draws every point"
+    )
+    
+    st.checkbox("Show Performance Panel", value=False, key="show_perf")
+
+
+def zoom_mask(index, key):
+    """Date-range slider over ``index``, returning the rows inside the window.
+
+    The window re-slices the full-resolution data, so narrowing it brings
+    back detail that downsampling the whole period dropped.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    first, last = index[0].date(), index[-1].date()
+    if first == last:
+        return np.ones(len(index), dtype=bool)
+    start, end = st.slider(
+        "Zoom",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="YYYY-MM-DD",
+        key=key
+    )
+    start = pd.Timestamp(start, tz=index.tz)
+    end = pd.Timestamp(end, tz=index.tz) + pd.Timedelta(days=1)
+    return (index >= start) & (index < end)
+
+
+def perf_panel(record):
+    """Collapsible breakdown of where the last draw spent its time."""
+    if record is None or not st.session_state.get("show_perf"):
+        return
+    import pandas as pd
+    
+    with st.expander("⏱️ Performance", expanded=False):
+        st.caption(
+            f"Total {record['total_ms']:.0f} ms, "
+            f"payload {record['payload_bytes'] / 1024:,.0f} KB"
+        )
+        phases = pd.DataFrame(
+            list(record["phases_ms"].items()),
+            columns=["Phase", "Time (ms)"]
+        )
+        st.dataframe(phases, use_container_width=True, hide_index=True)
+        figures = pd.DataFrame(record["figures"]).rename(columns={
+            "name": "Figure", "traces": "Traces", "points": "Points", "bytes": "Payload (bytes)"
+        })
+        st.dataframe(figures, use_container_width=True, hide_index=True)
+
+
+def single_symbol_view(config):
+    """Price, volume and indicator charts plus the information panel.
+
+    Runs as a fragment. In live mode Streamlit reruns just this function on
+    a timer; each of those runs asks the provider for the bars after the
+    last stored one only and appends them to the cached history.
+    """
+    from market_data import FETCH_TIMEOUT, load_history, load_info_async
+    from periods import covering_period, slice_period
+    from perf import PhaseTimer, exporting
+    from pipeline import chart_bars, single_figures, single_view
+    from providers import get_provider
+    
+    symbol = config["symbol"]
+    period = config["period"]
+    period_label = config["period_label"]
+    max_points = config["max_points"]
+    chart_type = config["chart_type"]
+    interval = config["interval"]
+    indicator_labels = config["indicators"]
+    
+    # Timer reruns poll for new bars, the run started by the full script does not
+    poll = config["live"] and not st.session_state.pop("full_run", False)
+    
+    timer = PhaseTimer("single", enabled=st.session_state.get("show_perf") or exporting())
+    
+    # Company info is fetched in the background while the charts are built,
+    # once per symbol since live updates only move prices
+    info_key = f"info-{symbol}"
+    info_future = None if info_key in st.session_state else load_info_async(symbol)
+    
+    try:
+        with st.spinner(f"Fetching data for {symbol}..."):
+            # Load the full cached window, only the newest bars are downloaded
+            # once cached. Indicators and resampled bars are computed over all
+            # of it so they are warmed up at the start of the period.
+            history = load_history(symbol, covering_period(period), force_refresh=poll)
+            now = get_provider().now()
+            timer.lap("fetch")
+            data = slice_period(history, period, now)
+            
+            if data.empty:
+                st.error(f"No data found for symbol: {symbol}")
+            else:
+                # Create main chart
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    st.subheader(f"{symbol} - {period_label}")
+                    
+                    chart_history, chart_data = chart_bars(history, period, interval, now, key=symbol)
+                    if chart_data.empty:
+                        view = chart_data
+                    else:
+                        view = chart_data[zoom_mask(chart_data.index, f"zoom-{symbol}-{period}")]
+                    
+                    # Indicator values, computed once per symbol and extended as bars arrive
+                    single = single_view(view, chart_history, chart_type, indicator_labels, max_points,
+                                         key=f"{symbol}:{interval}")
+                    timer.lap("transform")
+                    
+                    # Each figure is drawn before the next one is built
+                    for name, fig in single_figures(single, symbol, chart_type):
+                        if name == "Volume":
+                            st.subheader("Trading Volume")
+                        timer.figure(name, fig)
+                        st.plotly_chart(fig, use_container_width=True)
+                        timer.lap("render")
+                
+                with col2:
+                    # Stock info panel
+                    st.subheader("Stock Information")
+                    
+                    # Get current price info
+                    current_price = data['Close'].iloc[-1]
+                    previous_price = data['Close'].iloc[-2] if len(data) > 1 else current_price
+                    price_change = current_price - previous_price
+                    price_change_pct = (price_change / previous_price) * 100
+                    
+                    # Display metrics
+                    st.metric(
+                        label="Current Price",
+                        value=f"${current_price:.2f}",
+                        delta=f"{price_change:+.2f} ({price_change_pct:+.2f}%)"
+                    )
+                    
+                    # Additional metrics
+                    high_52w = data['High'].max()
+                    low_52w = data['Low'].min()
+                    avg_volume = data['Volume'].mean()
+                    
+                    st.metric("52W High", f"${high_52w:.2f}")
+                    st.metric("52W Low", f"${low_52w:.2f}")
+                    st.metric("Avg Volume", f"{avg_volume:,.0f}")
+                    
+                    # Filled in once the background fetch is done
+                    info_slot = st.empty()
+                    if info_key not in st.session_state:
+                        info_slot.caption("Loading company information...")
+                
+                # Everything else is already on the page while we wait
+                timer.lap("render")
+                try:
+                    if info_future is not None:
+                        st.session_state[info_key] = info_future.result(timeout=FETCH_TIMEOUT)
+                    info = st.session_state[info_key]
+                    timer.lap("fetch")
+                    with info_slot.container():
+                        if 'longName' in info:
+                            st.write(f"**Company:** {info['longName']}")
+                        if 'sector' in info:
+                            st.write(f"**Sector:** {info['sector']}")
+                        if 'marketCap' in info:
+                            market_cap = info['marketCap']
+                            if market_cap > 1e12:
+                                st.write(f"**Market Cap:** ${market_cap/1e12:.2f}T")
+                            elif market_cap > 1e9:
+                                st.write(f"**Market Cap:** ${market_cap/1e9:.2f}B")
+                            else:
+                                st.write(f"**Market Cap:** ${market_cap/1e6:.2f}M")
+                except:
+                    info_slot.empty()
+                
+                timer.lap("render")
+                perf_panel(timer.finish(
+                    symbol=symbol,
+                    period=period,
+                    chart_type=chart_type,
+                    interval=str(interval),
+                    bars=len(single.bars)
+                ))
+    
+    except Exception as e:
+        st.error(f"Error fetching data: {str(e)}")
+
 
 # Main content area
 if st.sidebar.button("📊 Draw Chart", type="primary", use_container_width=True):
+    # Remember what was drawn so in-chart controls such as zoom survive reruns
+    single = mode == "Single Symbol"
+    st.session_state.chart_config = dict(
+        mode=mode,
+        period=period,
+        period_label=period_label,
+        max_points=max_points or None,
+        symbol=symbol if single else None,
+        chart_type=chart_type if single else None,
+        interval=interval if single else None,
+        indicators=indicator_labels if single else None,
+        live=live if single else False,
+        refresh_seconds=refresh_seconds if single else None,
+        symbols=None if single else symbols
+    )
+
+if "chart_config" in st.session_state:
+    config = st.session_state.chart_config
+    mode = config["mode"]
+    period = config["period"]
+    period_label = config["period_label"]
+    max_points = config["max_points"]
+    symbol = config["symbol"]
+    symbols = config["symbols"]
     
     if mode == "Single Symbol":
         if symbol:
-            try:
-                with st.spinner(f"Fetching data for {symbol}..."):
-                    # Download data
-                    ticker = yf.Ticker(symbol)
-                    data = ticker.history(period=period)
-                    
-                    if data.empty:
-                        st.error(f"No data found for symbol: {symbol}")
-                    else:
-                        # Create main chart
-                        col1, col2 = st.columns([3, 1])
-                        
-                        with col1:
-                            st.subheader(f"{symbol} - {period_label}")
-                            
-                            fig = go.Figure()
-                            
-                            if chart_type == "Candlestick":
-                                fig.add_trace(go.Candlestick(
-                                    x=data.index,
-                                    open=data['Open'],
-                                    high=data['High'],
-                                    low=data['Low'],
-                                    close=data['Close'],
-                                    name=symbol,
-                                    increasing_line_color='#00d4aa',
-                                    decreasing_line_color='#ff6b6b'
-                                ))
-                            elif chart_type == "OHLC":
-                                # Custom OHLC implementation with proper bars
-                                # Calculate appropriate tick width based on data range
-                                date_range = data.index[-1] - data.index[0]
-                                tick_width = date_range / (len(data) * 8)  # Proportional to data density
-                                
-                                # Create OHLC bars
-                                for i, (date, row) in enumerate(data.iterrows()):
-                                    color = '#00d4aa' if row['Close'] >= row['Open'] else '#ff6b6b'
-                                    
-                                    # High-Low vertical line
-                                    fig.add_trace(go.Scatter(
-                                        x=[date, date],
-                                        y=[row['Low'], row['High']],
-                                        mode='lines',
-                                        line=dict(color=color, width=2),
-                                        showlegend=False,
-                                        hoverinfo='skip'
-                                    ))
-                                    
-                                    # Open tick (left horizontal line)
-                                    fig.add_trace(go.Scatter(
-                                        x=[date - tick_width, date],
-                                        y=[row['Open'], row['Open']],
-                                        mode='lines',
-                                        line=dict(color=color, width=3),
-                                        showlegend=False,
-                                        hoverinfo='skip'
-                                    ))
-                                    
-                                    # Close tick (right horizontal line)
-                                    fig.add_trace(go.Scatter(
-                                        x=[date, date + tick_width],
-                                        y=[row['Close'], row['Close']],
-                                        mode='lines',
-                                        line=dict(color=color, width=3),
-                                        showlegend=False,
-                                        hoverinfo='skip'
-                                    ))
-                                
-                                # Add invisible scatter for hover info
-                                fig.add_trace(go.Scatter(
-                                    x=data.index,
-                                    y=data['Close'],
-                                    mode='markers',
-                                    marker=dict(size=0, opacity=0),
-                                    name=symbol,
-                                    customdata=list(zip(data['Open'], data['High'], data['Low'], data['Close'])),
-                                    hovertemplate="<b>%{fullData.name}</b><br>" +
-                                                "Date: %{x}<br>" +
-                                                "Open: $%{customdata[0]:.2f}<br>" +
-                                                "High: $%{customdata[1]:.2f}<br>" +
-                                                "Low: $%{customdata[2]:.2f}<br>" +
-                                                "Close: $%{customdata[3]:.2f}<br>" +
-                                                "<extra></extra>"
-                                ))
-                            else:  # Line Chart
-                                fig.add_trace(go.Scatter(
-                                    x=data.index,
-                                    y=data['Close'],
-                                    mode='lines',
-                                    name=f"{symbol} Close",
-                                    line=dict(color='#1f77b4', width=2)
-                                ))
-                            
-                            fig.update_layout(
-                                title=f"{symbol} Stock Price - {chart_type}",
-                                xaxis_title="Date",
-                                template="plotly_white",
-                                height=500,
-                                showlegend=False,
-                                xaxis_rangeslider_visible=False
-                            )
-                            
-                            # Add invisible trace to activate right Y-axis
-                            fig.add_trace(go.Scatter(
-                                x=data.index,
-                                y=data['Close'],
-                                yaxis="y2",
-                                mode='lines',
-                                line=dict(color='rgba(0,0,0,0)'),  # Invisible line
-                                showlegend=False,
-                                hoverinfo='skip'
-                            ))
-                            
-                            # Update Y-axes to show SAME scale on both sides
-                            fig.update_layout(
-                                yaxis=dict(
-                                    title="Price ($)",
-                                    side="left"
-                                ),
-                                yaxis2=dict(
-                                    title="Price ($)",
-                                    overlaying="y", 
-                                    side="right",
-                                    showgrid=False
-                                )
-                            )
-                            
-                            st.plotly_chart(fig, use_container_width=True)
-                            
-                            # Volume chart
-                            st.subheader("Trading Volume")
-                            vol_fig = go.Figure()
-                            vol_fig.add_trace(go.Bar(
-                                x=data.index,
-                                y=data['Volume'],
-                                name="Volume",
-                                marker_color='rgba(31, 119, 180, 0.6)'
-                            ))
-                            
-                            vol_fig.update_layout(
-                                title="Trading Volume",
-                                xaxis_title="Date",
-                                template="plotly_white",
-                                height=200,
-                                showlegend=False
-                            )
-                            
-                            # Add invisible trace to activate right Y-axis for volume
-                            vol_fig.add_trace(go.Bar(
-                                x=data.index,
-                                y=data['Volume'],
-                                yaxis="y2",
-                                marker_color='rgba(0,0,0,0)',  # Invisible bars
-                                showlegend=False,
-                                hoverinfo='skip'
-                            ))
-                            
-                            # Update Y-axes to show SAME scale on both sides
-                            vol_fig.update_layout(
-                                yaxis=dict(
-                                    title="Volume",
-                                    side="left"
-                                ),
-                                yaxis2=dict(
-                                    title="Volume",
-                                    overlaying="y",
-                                    side="right",
-                                    showgrid=False
-                                )
-                            )
-                            
-                            st.plotly_chart(vol_fig, use_container_width=True)
-                        
-                        with col2:
-                            # Stock info panel
-                            st.subheader("Stock Information")
-                            
-                            # Get current price info
-                            current_price = data['Close'].iloc[-1]
-                            previous_price = data['Close'].iloc[-2] if len(data) > 1 else current_price
-                            price_change = current_price - previous_price
-                            price_change_pct = (price_change / previous_price) * 100
-                            
-                            # Display metrics
-                            st.metric(
-                                label="Current Price",
-                                value=f"${current_price:.2f}",
-                                delta=f"{price_change:+.2f} ({price_change_pct:+.2f}%)"
-                            )
-                            
-                            # Additional metrics
-                            high_52w = data['High'].max()
-                            low_52w = data['Low'].min()
-                            avg_volume = data['Volume'].mean()
-                            
-                            st.metric("52W High", f"${high_52w:.2f}")
-                            st.metric("52W Low", f"${low_52w:.2f}")
-                            st.metric("Avg Volume", f"{avg_volume:,.0f}")
-                            
-                            # Get company info
-                            try:
-                                info = ticker.info
-                                if 'longName' in info:
-                                    st.write(f"**Company:** {info['longName']}")
-                                if 'sector' in info:
-                                    st.write(f"**Sector:** {info['sector']}")
-                                if 'marketCap' in info:
-                                    market_cap = info['marketCap']
-                                    if market_cap > 1e12:
-                                        st.write(f"**Market Cap:** ${market_cap/1e12:.2f}T")
-                                    elif market_cap > 1e9:
-                                        st.write(f"**Market Cap:** ${market_cap/1e9:.2f}B")
-                                    else:
-                                        st.write(f"**Market Cap:** ${market_cap/1e6:.2f}M")
-                            except:
-                                pass
-            
-            except Exception as e:
-                st.error(f"Error fetching data: {str(e)}")
+            # In live mode Streamlit reruns only this fragment on a timer
+            st.session_state.full_run = True
+            run_every = config["refresh_seconds"] if config["live"] else None
+            st.fragment(run_every=run_every)(single_symbol_view)(config)
         else:
             st.warning("Please enter a symbol")
     
     else:  # Multi-symbol comparison
         if symbols and len(symbols) > 1:
+            from charts import comparison_figure
+            from compare import summary
+            from market_data import load_histories
+            from perf import PhaseTimer, exporting
+            from pipeline import comparison_closes
+            
+            timer = PhaseTimer("comparison", enabled=st.session_state.get("show_perf") or exporting())
             try:
                 with st.spinner(f"Fetching data for {len(symbols)} symbols..."):
-                    # Download data for all symbols
-                    comparison_data = {}
-                    valid_symbols = []
+                    # Download data for all symbols concurrently, slow or failing
+                    # symbols are reported without holding up the others
+                    frames, errors = load_histories(symbols, period)
+                    timer.lap("fetch")
+                    valid_symbols = list(frames)
                     
-                    for symbol in symbols:
-                        try:
-                            ticker = yf.Ticker(symbol)
-                            data = ticker.history(period=period)
-                            if not data.empty:
-                                comparison_data[symbol] = data['Close']
-                                valid_symbols.append(symbol)
-                        except:
-                            st.warning(f"Could not fetch data for {symbol}")
+                    for symbol, reason in errors.items():
+                        st.warning(f"Could not fetch data for {symbol} ({reason})")
                     
                     if valid_symbols:
-                        # Create comparison DataFrame
-                        df = pd.DataFrame(comparison_data)
-                        
-                        # Calculate percentage change from start
-                        pct_change_df = df.pct_change(periods=len(df)-1).iloc[-1:] * 100
-                        for col in df.columns:
-                            df[f"{col}_pct"] = ((df[col] / df[col].iloc[0]) - 1) * 100
+                        # Align every symbol onto one calendar and normalize in one pass
+                        comparison = comparison_closes(frames)
                         
                         # Create comparison chart
                         st.subheader(f"Multi-Symbol Comparison - {period_label}")
                         st.markdown("**Percentage change from period start**")
                         
-                        fig = go.Figure()
-                        
-                        colors = px.colors.qualitative.Set1[:len(valid_symbols)]
-                        
-                        for i, symbol in enumerate(valid_symbols):
-                            fig.add_trace(go.Scatter(
-                                x=df.index,
-                                y=df[f"{symbol}_pct"],
-                                mode='lines',
-                                name=symbol,
-                                line=dict(color=colors[i], width=2),
-                                hovertemplate=f"<b>{symbol}</b><br>" +
-                                            "Date: %{x}<br>" +
-                                            "Change: %{y:.2f}%<br>" +
-                                            "<extra></extra>"
-                            ))
-                        
-                        fig.update_layout(
-                            title="Symbol Performance Comparison",
-                            xaxis_title="Date",
-                            template="plotly_white",
-                            height=600,
-                            legend=dict(
-                                yanchor="top",
-                                y=0.99,
-                                xanchor="left",
-                                x=0.01
-                            ),
-                            hovermode='x unified'
-                        )
+                        rows = zoom_mask(comparison.index, f"zoom-compare-{period}")
+                        timer.lap("transform")
                         
-                        # Get the Y-axis range from the data to ensure both axes match exactly
-                        all_values = []
-                        for symbol in valid_symbols:
-                            all_values.extend(df[f"{symbol}_pct"].tolist())
-                        y_min = min(all_values)
-                        y_max = max(all_values)
-                        
-                        # Add some padding
-                        y_padding = (y_max - y_min) * 0.1
-                        y_range = [y_min - y_padding, y_max + y_padding]
-                        
-                        # Add minimal invisible trace to activate right Y-axis
-                        fig.add_trace(go.Scatter(
-                            x=[df.index[0], df.index[-1]],  # Just first and last points
-                            y=[y_range[0], y_range[1]],     # Just min and max values
-                            yaxis="y2",
-                            mode='markers',
-                            marker=dict(size=0, opacity=0),  # Completely invisible
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ))
-                        
-                        # Update Y-axes to show SAME scale on both sides with exact range
-                        fig.update_layout(
-                            yaxis=dict(
-                                title="Percentage Change (%)",
-                                side="left",
-                                range=y_range
-                            ),
-                            yaxis2=dict(
-                                title="Percentage Change (%)",
-                                overlaying="y", 
-                                side="right",
-                                showgrid=False,
-                                range=y_range  # Force same range
-                            )
-                        )
-                        
-                        # Add zero line
-                        fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+                        fig = comparison_figure(comparison, rows, max_points)
                         
+                        timer.figure("Comparison", fig)
                         st.plotly_chart(fig, use_container_width=True)
+                        timer.lap("render")
                         
                         # Performance summary table
                         st.subheader("Performance Summary")
                         
-                        summary_data = []
-                        for symbol in valid_symbols:
-                            current_price = df[symbol].iloc[-1]
-                            start_price = df[symbol].iloc[0]
-                            total_return = ((current_price / start_price) - 1) * 100
-                            
-                            summary_data.append({
-                                "Symbol": symbol,
-                                "Start Price": f"${start_price:.2f}",
-                                "Current Price": f"${current_price:.2f}",
-                                "Total Return": f"{total_return:+.2f}%"
-                            })
-                        
-                        summary_df = pd.DataFrame(summary_data)
+                        summary_df = summary(comparison)
+                        summary_df["Start Price"] = summary_df["Start Price"].map("${:.2f}".format)
+                        summary_df["Current Price"] = summary_df["Current Price"].map("${:.2f}".format)
+                        summary_df["Total Return"] = summary_df["Total Return"].map("{:+.2f}%".format)
                         st.dataframe(summary_df, use_container_width=True, hide_index=True)
                         
+                        timer.lap("render")
+                        perf_panel(timer.finish(
+                            symbols=len(valid_symbols),
+                            period=period,
+                            rows=len(comparison.index)
+                        ))
+                        
                     else:
                         st.error("No valid symbols found")
                         
@@ -0,0 +1,148 @@
+"""Build time, peak memory and payload size of every figure builder.
+
+Runs the Single Symbol pipeline (transform, then price/volume figures for
+each chart type) on synthetic histories from one month to twenty years,
+and the comparison pipeline on 2 to 500 symbols. Timings are the best of
+``--repeat`` runs; peak memory comes from one extra run under tracemalloc
+so it does not skew the timings.
+
+    python benchmarks/bench_figures.py
+    python benchmarks/bench_figures.py --save benchmarks/results.jsonl   # append this run
+    python benchmarks/bench_figures.py --compare benchmarks/results.jsonl  # diff against the last saved run
+
+Saved runs are JSON lines tagged with the git commit, so the file tracks
+the numbers over time.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from charts import comparison_figure  # noqa: E402
+from downsample import DEFAULT_MAX_POINTS  # noqa: E402
+from pipeline import chart_bars, comparison_closes, single_figures, single_view  # noqa: E402
+from synthetic import make_ohlcv  # noqa: E402
+
+SIZES = {"1mo": 21, "1y": 252, "5y": 1260, "20y": 5040}
+CHART_TYPES = ("Candlestick", "OHLC", "Line Chart")
+SYMBOL_COUNTS = (2, 10, 50, 100, 500)
+COMPARISON_SIZES = ("1y", "5y")
+# Relative slowdown or growth reported by --compare
+THRESHOLD = 0.2
+
+
+def _single(data, period, chart_type, max_points):
+    chart_history, chart_data = chart_bars(data, period, "Daily", data.index[-1])
+    single = single_view(chart_data, chart_history, chart_type, ("SMA 20", "RSI 14"), max_points)
+    return list(single_figures(single, "SYN", chart_type))
+
+
+def _comparison(frames, max_points):
+    return [("Comparison", comparison_figure(comparison_closes(frames), max_points=max_points))]
+
+
+def measure(build, repeat):
+    """Best build time, peak traced memory and JSON payload of ``build()``."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        figures = build()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    payload = sum(len(fig.to_json()) for _, fig in figures)
+    serialize = time.perf_counter() - started
+    return {
+        "build_ms": round(best * 1000, 2),
+        "serialize_ms": round(serialize * 1000, 2),
+        "peak_kb": round(peak / 1024, 1),
+        "payload_kb": round(payload / 1024, 1),
+    }
+
+
+def cases(quick=False):
+    """Yield ``(name, build)`` for every benchmark case."""
+    for label, bars in SIZES.items():
+        data = make_ohlcv(bars)
+        for chart_type in CHART_TYPES:
+            yield (f"single/{chart_type}/{label}",
+                   lambda data=data, label=label, chart_type=chart_type:
+                   _single(data, label, chart_type, DEFAULT_MAX_POINTS))
+
+    for label in COMPARISON_SIZES:
+        for count in SYMBOL_COUNTS:
+            if quick and count > 50:
+                continue
+            frames = {f"S{i}": make_ohlcv(SIZES[label], seed=i) for i in range(count)}
+            yield (f"comparison/{count}/{label}",
+                   lambda frames=frames: _comparison(frames, DEFAULT_MAX_POINTS))
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _last_run(path):
+    last = None
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, the best is kept")
+    parser.add_argument("--quick", action="store_true", help="skip the comparisons above 50 symbols")
+    parser.add_argument("--save", metavar="PATH", help="append this run to a JSON lines file")
+    parser.add_argument("--compare", metavar="PATH", help="report changes against the last run in PATH")
+    args = parser.parse_args(argv)
+
+    previous = _last_run(args.compare)["results"] if args.compare and os.path.exists(args.compare) else {}
+
+    # Plotly loads its validators on first use, keep that out of the first case
+    _single(make_ohlcv(SIZES["1mo"]), "1mo", "Candlestick", None)
+
+    results = {}
+    print(f"{'case':<30}{'build ms':>10}{'ser. ms':>10}{'peak KB':>10}{'payload KB':>12}")
+    for name, build in cases(args.quick):
+        result = results[name] = measure(build, args.repeat)
+        line = (f"{name:<30}{result['build_ms']:>10.1f}{result['serialize_ms']:>10.1f}"
+                f"{result['peak_kb']:>10.0f}{result['payload_kb']:>12.1f}")
+        before = previous.get(name)
+        if before:
+            changes = [
+                f"{key} {result[key] / before[key] - 1:+.0%}"
+                for key in ("build_ms", "peak_kb", "payload_kb")
+                if before[key] and abs(result[key] / before[key] - 1) > THRESHOLD
+            ]
+            if changes:
+                line += "  (" + ", ".join(changes) + ")"
+        print(line)
+
+    if args.save:
+        record = {"ts": time.time(), "commit": _commit(), "python": sys.version.split()[0], "results": results}
+        with open(args.save, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
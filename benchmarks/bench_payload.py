@@ -0,0 +1,60 @@
+"""Regression check on how much a figure sends beyond its visible data.
+
+Builds every figure the app draws on synthetic histories and compares the
+serialized size of all traces with that of the visible traces alone.
+Exits non-zero if any figure goes over ``MAX_RATIO``, e.g. because a
+helper trace started repeating a full series again.
+
+    python benchmarks/bench_payload.py
+"""
+import os
+import sys
+
+from plotly.io.json import to_json_plotly
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from charts import comparison_figure, price_figure, volume_figure  # noqa: E402
+from compare import align_closes  # noqa: E402
+from synthetic import make_ohlcv  # noqa: E402
+
+MAX_RATIO = 1.1
+SIZES = {"1mo": 21, "1y": 252, "5y": 1260, "20y": 5040}
+
+
+def _size(traces):
+    return len(to_json_plotly([trace.to_plotly_json() for trace in traces]))
+
+
+def payload_ratio(fig):
+    # Everything on the mirrored right-hand axis exists only to draw that axis
+    visible = [t for t in fig.data if getattr(t, 'yaxis', None) != 'y2']
+    return _size(fig.data) / _size(visible)
+
+
+def main():
+    failures = 0
+    print(f"{'figure':<22}{'bars':>6}{'ratio':>8}")
+    for label, bars in SIZES.items():
+        data = make_ohlcv(bars)
+        figures = {
+            f"price/{chart_type}": price_figure(data, "SYN", chart_type)
+            for chart_type in ("Candlestick", "OHLC", "Line Chart")
+        }
+        figures["volume"] = volume_figure(data)
+        closes = {f"S{i}": make_ohlcv(bars, seed=i)["Close"] for i in range(3)}
+        figures["comparison"] = comparison_figure(align_closes(closes))
+
+        for name, fig in figures.items():
+            ratio = payload_ratio(fig)
+            flag = "" if ratio <= MAX_RATIO else "  FAIL"
+            failures += bool(flag)
+            print(f"{name + ' ' + label:<22}{bars:>6}{ratio:>8.3f}{flag}")
+
+    if failures:
+        print(f"{failures} figure(s) exceed {MAX_RATIO}x their visible data")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Cold-start time of the app, up to first paint and first chart.
+
+Each run is a fresh interpreter, like a newly started replica. It runs
+``app.py`` headless with Streamlit's ``AppTest`` and records:
+
+- import: loading Streamlit and its test harness
+- first paint: the first script run, which draws the sidebar and welcome screen
+- first chart: clicking Draw Chart for one symbol, served from synthetic
+  replay fixtures so no network is needed
+
+It also lists which heavy modules the first paint loaded and exits
+non-zero if any of ``HEAVY`` was, since the welcome screen needs none.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import make_ohlcv  # noqa: E402
+
+HEAVY = ("numpy", "pandas", "yfinance", "plotly.express")
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+painted = time.perf_counter()
+loaded = [name for name in sys.argv[2].split(",") if name in sys.modules]
+at.sidebar.button[0].click().run()
+charted = time.perf_counter()
+print(json.dumps({
+    "import": imported - started,
+    "first_paint": painted - imported,
+    "first_chart": charted - painted,
+    "charts": len(at.get("plotly_chart")),
+    "exceptions": [str(e.value) for e in at.exception],
+    "loaded_at_paint": loaded,
+}))
+"""
+
+
+def run_once(fixtures, store):
+    env = dict(
+        os.environ,
+        CHARTING_PROVIDER="replay",
+        CHARTING_REPLAY_DIR=fixtures,
+        CHARTING_REPLAY_NOW="2024-12-31",
+        CHARTING_STORE=store,
+    )
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, os.path.join(ROOT, "app.py"), ",".join(HEAVY)],
+        capture_output=True, text=True, env=env, cwd=ROOT, check=True
+    ).stdout
+    wall = time.perf_counter() - started
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process"] = wall - result["import"] - result["first_paint"] - result["first_chart"]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app's default symbol, as a recorded yfinance history
+        make_ohlcv(1260).to_csv(os.path.join(tmp, "VTI.csv"))
+        results = []
+        for i in range(args.runs):
+            # A fresh store every run, so the first chart includes the cold fetch
+            results.append(run_once(tmp, os.path.join(tmp, f"store-{i}.sqlite")))
+
+    for result in results:
+        if result["exceptions"] or not result["charts"]:
+            print("first chart failed:", result["exceptions"])
+            sys.exit(1)
+
+    print(f"{'phase':<14}{'median s':>10}{'max s':>10}")
+    for phase in ("process", "import", "first_paint", "first_chart"):
+        values = [r[phase] for r in results]
+        print(f"{phase:<14}{statistics.median(values):>10.3f}{max(values):>10.3f}")
+
+    loaded = sorted({name for r in results for name in r["loaded_at_paint"]})
+    print("heavy modules loaded at first paint:", ", ".join(loaded) or "none")
+    if loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Heap memory held per loaded symbol, float64 frames versus mapped columns.
+
+Writes synthetic 5-year histories for ``--symbols`` symbols as column
+files in a temporary directory, then compares the Python heap needed to
+hold every symbol as a regular float64 DataFrame with that of the
+memory-mapped frames, whose pages live in the shared OS page cache.
+
+    python benchmarks/bench_storage.py --symbols 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import columnar  # noqa: E402
+from synthetic import make_ohlcv  # noqa: E402
+
+BARS = 1260
+
+
+def _heap(load):
+    tracemalloc.start()
+    frames = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    symbols = [f"S{i}" for i in range(args.symbols)]
+    histories = {symbol: make_ohlcv(BARS, seed=i).assign(Dividends=0.0) for i, symbol in enumerate(symbols)}
+
+    with tempfile.TemporaryDirectory() as root:
+        for symbol, data in histories.items():
+            columnar.write(root, symbol, 1.0, data)
+        disk = sum(
+            os.path.getsize(os.path.join(path, name))
+            for path, _, names in os.walk(root) for name in names
+        )
+
+        frames_heap, _ = _heap(lambda: {s: d.astype(float) for s, d in histories.items()})
+        mapped_heap, mapped = _heap(lambda: {s: columnar.load(root, s, 1.0, "America/New_York") for s in symbols})
+        assert all(len(frame) == BARS for frame in mapped.values())
+        del mapped
+
+    print(f"{args.symbols} symbols x {BARS} bars")
+    print(f"{'float64 frames, heap':<28}{frames_heap / 2**20:>10.1f} MB")
+    print(f"{'mapped columns, heap':<28}{mapped_heap / 2**20:>10.1f} MB")
+    print(f"{'mapped columns, on disk':<28}{disk / 2**20:>10.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
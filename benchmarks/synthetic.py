@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(bars, seed=0, end="2024-12-31", tz="America/New_York"):
+    """Random-walk daily bars shaped like a yfinance history frame."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end, periods=bars, tz=tz, name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    open_ = close * (1 + rng.normal(0, 0.005, bars))
+    spread = np.abs(rng.normal(0, 0.01, bars)) * close
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng.integers(100_000, 10_000_000, bars),
+        },
+        index=index
+    )
@@ -0,0 +1,325 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from compare import y_range as comparison_y_range
+from downsample import lttb_columns
+
+UP_COLOR = '#00d4aa'
+DOWN_COLOR = '#ff6b6b'
+
+# plotly.colors.qualitative.Set1, cycled for the comparison lines
+COMPARISON_COLORS = [
+    'rgb(228,26,28)', 'rgb(55,126,184)', 'rgb(77,175,74)', 'rgb(152,78,163)', 'rgb(255,127,0)',
+    'rgb(255,255,51)', 'rgb(166,86,40)', 'rgb(247,129,191)', 'rgb(153,153,153)',
+]
+
+# Above this many series the comparison chart switches to WebGL traces and
+# per-point hover, SVG and a unified hover box do not scale to hundreds
+WEBGL_SERIES = 50
+
+
+def mirror_y_axis(fig, title, y_range=None):
+    """Repeat the left Y axis on the right without sending the data twice.
+
+    Plotly only draws an axis that some trace refers to, so a single empty
+    trace sits on ``y2``. ``matches`` keeps its range locked to the left
+    axis, including while the user zooms.
+    """
+    fig.add_trace(go.Scatter(
+        x=[],
+        y=[],
+        yaxis="y2",
+        showlegend=False
+    ))
+    fig.update_layout(
+        yaxis=dict(
+            title=title,
+            side="left",
+            range=y_range
+        ),
+        yaxis2=dict(
+            title=title,
+            overlaying="y",
+            side="right",
+            showgrid=False,
+            matches="y"
+        )
+    )
+    return fig
+
+
+def _wall_clock(index):
+    # Plotly draws timestamps in wall-clock time, so drop the zone before
+    # doing NumPy arithmetic on the raw datetime64 values
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_localize(None)
+    return index.values
+
+
+def ohlc_traces(data, name):
+    """Build OHLC bars as a handful of NaN-separated traces.
+
+    Every bar's high-low stem and open/close ticks are packed into one stem
+    trace and one tick trace per up/down color, so the trace count stays
+    constant no matter how many bars are drawn. A transparent marker trace
+    carries the hover text.
+    """
+    dates = _wall_clock(data.index)
+    opens = data['Open'].to_numpy(dtype=float)
+    highs = data['High'].to_numpy(dtype=float)
+    lows = data['Low'].to_numpy(dtype=float)
+    closes = data['Close'].to_numpy(dtype=float)
+
+    # Calculate appropriate tick width based on data range
+    if len(dates) > 1:
+        tick_width = (dates[-1] - dates[0]) / (len(dates) * 8)  # Proportional to data density
+    else:
+        tick_width = np.timedelta64(6, 'h')
+
+    gap = np.full(len(dates), np.nan)
+    up = closes >= opens
+
+    traces = []
+    for mask, color in ((up, UP_COLOR), (~up, DOWN_COLOR)):
+        if not mask.any():
+            continue
+        d = dates[mask]
+
+        # High-Low vertical lines: (date, low) -> (date, high), then a gap
+        stem_x = np.column_stack([d, d, d]).ravel()
+        stem_y = np.column_stack([lows[mask], highs[mask], gap[mask]]).ravel()
+
+        # Open tick to the left, close tick to the right, each followed by a gap
+        left = d - tick_width
+        right = d + tick_width
+        tick_x = np.column_stack([left, d, d, d, right, right]).ravel()
+        tick_y = np.column_stack([
+            opens[mask], opens[mask], gap[mask],
+            closes[mask], closes[mask], gap[mask],
+        ]).ravel()
+
+        traces.append(go.Scatter(
+            x=stem_x,
+            y=stem_y,
+            mode='lines',
+            line=dict(color=color, width=2),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        traces.append(go.Scatter(
+            x=tick_x,
+            y=tick_y,
+            mode='lines',
+            line=dict(color=color, width=3),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+
+    # Add invisible scatter for hover info
+    traces.append(go.Scatter(
+        x=data.index,
+        y=closes,
+        mode='markers',
+        marker=dict(size=0, opacity=0),
+        name=name,
+        customdata=np.column_stack([opens, highs, lows, closes]),
+        hovertemplate="<b>%{fullData.name}</b><br>" +
+                      "Date: %{x}<br>" +
+                      "Open: $%{customdata[0]:.2f}<br>" +
+                      "High: $%{customdata[1]:.2f}<br>" +
+                      "Low: $%{customdata[2]:.2f}<br>" +
+                      "Close: $%{customdata[3]:.2f}<br>" +
+                      "<extra></extra>"
+    ))
+    return traces
+
+
+OVERLAY_COLORS = ['#ff7f0e', '#9467bd', '#8c564b', '#e377c2', '#17becf', '#bcbd22']
+
+
+def overlay_traces(frame, label, color):
+    """Lines for a price-overlay indicator, one per output column."""
+    traces = []
+    for col in frame.columns:
+        name = label if len(frame.columns) == 1 else f"{label} {col}"
+        traces.append(go.Scatter(
+            x=frame.index,
+            y=frame[col],
+            mode='lines',
+            name=name,
+            line=dict(color=color, width=1, dash='dot' if col in ('Upper', 'Lower') else None),
+            hovertemplate=f"{name}: " + "%{y:.2f}<extra></extra>"
+        ))
+    return traces
+
+
+def indicator_figure(name, frame, label):
+    """Stand-alone panel for an oscillator such as RSI or MACD."""
+    fig = go.Figure()
+    if name == "MACD":
+        fig.add_trace(go.Bar(
+            x=frame.index,
+            y=frame['Histogram'],
+            name="Histogram",
+            marker_color=np.where(frame['Histogram'].to_numpy() >= 0, UP_COLOR, DOWN_COLOR)
+        ))
+        fig.add_trace(go.Scatter(x=frame.index, y=frame['MACD'], mode='lines', name="MACD",
+                                 line=dict(color='#1f77b4', width=1.5)))
+        fig.add_trace(go.Scatter(x=frame.index, y=frame['Signal'], mode='lines', name="Signal",
+                                 line=dict(color='#ff7f0e', width=1.5)))
+    else:
+        for col in frame.columns:
+            fig.add_trace(go.Scatter(x=frame.index, y=frame[col], mode='lines', name=col,
+                                     line=dict(color='#9467bd', width=1.5)))
+        if name == "RSI":
+            fig.add_hline(y=70, line_dash="dash", line_color="gray", opacity=0.5)
+            fig.add_hline(y=30, line_dash="dash", line_color="gray", opacity=0.5)
+            fig.update_yaxes(range=[0, 100])
+
+    fig.update_layout(
+        title=label,
+        template="plotly_white",
+        height=200,
+        showlegend=False,
+        margin=dict(t=40, b=20),
+        hovermode='x unified'
+    )
+    return fig
+
+
+def candlestick_traces(data, name):
+    """Candlestick trace for OHLC bars."""
+    return [go.Candlestick(
+        x=data.index,
+        open=data['Open'],
+        high=data['High'],
+        low=data['Low'],
+        close=data['Close'],
+        name=name,
+        increasing_line_color=UP_COLOR,
+        decreasing_line_color=DOWN_COLOR
+    )]
+
+
+def line_traces(close, name):
+    """Line trace for a Close series."""
+    return [go.Scatter(
+        x=close.index,
+        y=close,
+        mode='lines',
+        name=f"{name} Close",
+        line=dict(color='#1f77b4', width=2)
+    )]
+
+
+def price_figure(bars, symbol, chart_type, line=None, overlays=()):
+    """Main price chart for the Single Symbol view.
+
+    ``bars`` feeds the Candlestick and OHLC types, ``line`` (a Close series,
+    possibly downsampled) the Line Chart type. ``overlays`` is a sequence of
+    ``(frame, label)`` indicator outputs aligned with the plotted points.
+    """
+    fig = go.Figure()
+
+    if chart_type == "Candlestick":
+        fig.add_traces(candlestick_traces(bars, symbol))
+    elif chart_type == "OHLC":
+        # All bars go into a fixed number of NaN-separated traces
+        fig.add_traces(ohlc_traces(bars, symbol))
+    else:  # Line Chart
+        fig.add_traces(line_traces(bars['Close'] if line is None else line, symbol))
+
+    for i, (values, label) in enumerate(overlays):
+        fig.add_traces(overlay_traces(values, label, OVERLAY_COLORS[i % len(OVERLAY_COLORS)]))
+
+    fig.update_layout(
+        title=f"{symbol} Stock Price - {chart_type}",
+        xaxis_title="Date",
+        template="plotly_white",
+        height=500,
+        showlegend=bool(overlays),
+        xaxis_rangeslider_visible=False
+    )
+    return mirror_y_axis(fig, "Price ($)")
+
+
+def volume_figure(bars):
+    """Volume bars for the Single Symbol view."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=bars.index,
+        y=bars['Volume'],
+        name="Volume",
+        marker_color='rgba(31, 119, 180, 0.6)'
+    ))
+
+    fig.update_layout(
+        title="Trading Volume",
+        xaxis_title="Date",
+        template="plotly_white",
+        height=200,
+        showlegend=False
+    )
+    return mirror_y_axis(fig, "Volume")
+
+
+def comparison_figure(comparison, rows=None, max_points=None):
+    """Percentage-change lines for an aligned ``compare.Comparison``.
+
+    ``rows`` optionally selects the visible rows (a zoom window), and
+    series longer than ``max_points`` are downsampled together with LTTB.
+    """
+    index = comparison.index
+    pct = comparison.pct
+    if rows is not None:
+        index = index[rows]
+        pct = pct[rows]
+
+    if max_points and len(index) > max_points:
+        picks = lttb_columns(pct, max_points)
+    else:
+        picks = None
+
+    many = len(comparison.symbols) > WEBGL_SERIES
+    scatter = go.Scattergl if many else go.Scatter
+    colors = COMPARISON_COLORS
+
+    traces = []
+    for i, symbol in enumerate(comparison.symbols):
+        x = index if picks is None else index[picks[:, i]]
+        y = pct[:, i] if picks is None else pct[picks[:, i], i]
+        traces.append(scatter(
+            x=x,
+            y=y,
+            mode='lines',
+            name=symbol,
+            line=dict(color=colors[i % len(colors)], width=1 if many else 2),
+            hovertemplate=f"<b>{symbol}</b><br>" +
+                          "Date: %{x}<br>" +
+                          "Change: %{y:.2f}%<br>" +
+                          "<extra></extra>"
+        ))
+
+    # One add_traces call, adding traces one at a time re-copies the list each time
+    fig = go.Figure()
+    fig.add_traces(traces)
+    fig.update_layout(
+        title="Symbol Performance Comparison",
+        xaxis_title="Date",
+        template="plotly_white",
+        height=600,
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01
+        ),
+        hovermode='closest' if many else 'x unified'
+    )
+
+    # Right-hand axis mirrors the left one without repeating any data
+    mirror_y_axis(fig, "Percentage Change (%)", y_range=comparison_y_range(pct))
+
+    # Add zero line
+    fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    return fig
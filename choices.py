@@ -0,0 +1,28 @@
+# Options offered in the sidebar. Kept free of NumPy, pandas and Plotly
+# imports so the page can be drawn before any of them are loaded.
+
+# Default number of points per series sent to the browser. Roughly two points
+# per horizontal pixel of a wide chart, beyond that extra points are invisible.
+DEFAULT_MAX_POINTS = 1500
+
+# Interval label -> number of trading days per bar, or a calendar grouping
+INTERVALS = {
+    "Daily": 1,
+    "Weekly": "W",
+    "Monthly": "M",
+}
+
+# Ready-made indicator parameter sets, label -> (indicator name, parameters)
+PRESETS = {
+    "SMA 20": ("SMA", {"window": 20}),
+    "SMA 50": ("SMA", {"window": 50}),
+    "SMA 200": ("SMA", {"window": 200}),
+    "EMA 20": ("EMA", {"span": 20}),
+    "EMA 50": ("EMA", {"span": 50}),
+    "Bollinger Bands": ("Bollinger", {"window": 20, "k": 2.0}),
+    "VWAP 20": ("VWAP", {"window": 20}),
+    "RSI 14": ("RSI", {"window": 14}),
+    "MACD 12/26/9": ("MACD", {"fast": 12, "slow": 26, "signal": 9}),
+}
+
+CHART_TYPES = ["Candlestick", "Line Chart", "OHLC"]
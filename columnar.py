@@ -0,0 +1,96 @@
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# Float columns, stored together as one (columns, rows) float32 block
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Dividends", "Stock Splits"]
+
+
+def columns_dir(store_path):
+    """Directory holding the column files that sit next to a SQLite store."""
+    return os.path.splitext(store_path)[0] + ".columns"
+
+
+def file_name(symbol):
+    """``symbol`` made safe to use as a file name, ``BRK/B`` and ``^GSPC`` are not."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+
+
+def _symbol_dir(root, symbol):
+    return os.path.join(root, file_name(symbol))
+
+
+def _version(refreshed_at):
+    return f"{refreshed_at or 0:.6f}"
+
+
+def write(root, symbol, refreshed_at, data):
+    """Write ``data`` as the column files for version ``refreshed_at``.
+
+    Each column group is an ``.npy`` file: int64 UTC epoch nanoseconds for
+    the index, a float32 block for prices and corporate actions, with NaN
+    for a missing price, and int64 volume. The version directory is filled
+    under a temporary name and renamed into place, so readers never see a
+    partial write, and older versions are removed. Processes that still map them keep their pages
+    until they let go.
+    """
+    base = _symbol_dir(root, symbol)
+    target = os.path.join(base, _version(refreshed_at))
+    if os.path.isdir(target):
+        return target
+
+    tmp = os.path.join(base, f".tmp-{uuid.uuid4().hex}")
+    os.makedirs(tmp)
+    index = data.index if data.index.tz is not None else data.index.tz_localize("UTC")
+    # Missing prices stay NaN so they draw as gaps; volume has no NaN in
+    # int64, and a missing one draws the same as zero
+    frame = data.reindex(columns=PRICE_COLUMNS + ["Volume"]).fillna(
+        {"Dividends": 0.0, "Stock Splits": 0.0, "Volume": 0}
+    )
+    np.save(os.path.join(tmp, "index.npy"), index.tz_convert("UTC").asi8)
+    np.save(os.path.join(tmp, "prices.npy"), frame[PRICE_COLUMNS].to_numpy(dtype=np.float32).T)
+    np.save(os.path.join(tmp, "volume.npy"), frame["Volume"].to_numpy(dtype=np.int64))
+    try:
+        os.rename(tmp, target)
+    except OSError:
+        # Another process published the same version first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    for name in os.listdir(base):
+        if name != _version(refreshed_at) and not name.startswith(".tmp-"):
+            shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+    return target
+
+
+def load(root, symbol, refreshed_at, tz=None):
+    """Memory-map version ``refreshed_at`` of ``symbol`` as a frame, or None.
+
+    Prices and volume are read-only views onto the mapped files, so every
+    session and process reading the symbol shares the same pages; only the
+    index is materialized to apply the timezone.
+    """
+    path = os.path.join(_symbol_dir(root, symbol), _version(refreshed_at))
+    try:
+        ts = np.load(os.path.join(path, "index.npy"), mmap_mode="r")
+        prices = np.load(os.path.join(path, "prices.npy"), mmap_mode="r")
+        volume = np.load(os.path.join(path, "volume.npy"), mmap_mode="r")
+    except (FileNotFoundError, ValueError):
+        return None
+
+    index = pd.DatetimeIndex(np.asarray(ts).view("M8[ns]")).tz_localize("UTC")
+    if tz:
+        index = index.tz_convert(tz)
+    index.name = "Date"
+    # One float32 block and one int64 block; concatenating two frames of
+    # different dtypes keeps both blocks as views
+    return pd.concat(
+        [
+            pd.DataFrame(prices.T, index=index, columns=PRICE_COLUMNS, copy=False),
+            pd.DataFrame({"Volume": volume}, index=index, copy=False),
+        ],
+        axis=1,
+        copy=False
+    )
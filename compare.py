@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# index:   union of every symbol's trading dates, tz-naive midnight
+# symbols: column order of the arrays below
+# prices:  (dates, symbols) closes, forward-filled after each first quote
+# pct:     (dates, symbols) percentage change from each first quote
+Comparison = namedtuple("Comparison", "index symbols prices pct")
+
+
+def _dates(index):
+    # Calendar day on the exchange's own clock, so an index quoted in UTC and
+    # a fund quoted in New York time still land on the same row
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype("datetime64[D]")
+
+
+def forward_fill(values):
+    """Fill NaNs down each column from the last valid row above, leading NaNs stay."""
+    rows = np.arange(len(values))[:, None]
+    last_valid = np.where(np.isnan(values), 0, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    # Before a column's first quote this points at row 0, which is NaN too
+    return values[last_valid, np.arange(values.shape[1])]
+
+
+def align_closes(closes):
+    """Align a ``{symbol: close series}`` mapping onto one calendar.
+
+    Symbols that trade on different calendars (equities, mutual funds that
+    skip some sessions, indices with their own holidays) are merged onto the
+    union of all their dates and each column is forward-filled from its
+    last quote. Percentage change is measured from each symbol's first
+    quote in the window.
+    """
+    symbols = list(closes)
+    days = [_dates(closes[symbol].index) for symbol in symbols]
+    values = [closes[symbol].to_numpy(dtype=float) for symbol in symbols]
+
+    if not symbols:
+        empty = np.empty((0, 0))
+        return Comparison(pd.DatetimeIndex([]), symbols, empty, empty)
+
+    all_days = np.concatenate(days)
+    index = np.unique(all_days)
+
+    # Scatter every (date, symbol) quote into the 2-D grid in one assignment
+    rows = np.searchsorted(index, all_days)
+    cols = np.repeat(np.arange(len(symbols)), [len(d) for d in days])
+    prices = np.full((len(index), len(symbols)), np.nan)
+    prices[rows, cols] = np.concatenate(values)
+    prices = forward_fill(prices)
+
+    first = np.argmax(~np.isnan(prices), axis=0)
+    base = prices[first, np.arange(len(symbols))]
+    pct = (prices / base - 1) * 100
+
+    return Comparison(pd.DatetimeIndex(index.astype("datetime64[ns]")), symbols, prices, pct)
+
+
+def y_range(pct, padding=0.1):
+    """Shared Y-axis range covering every series, with ``padding`` on both ends."""
+    if pct.size == 0 or np.isnan(pct).all():
+        return [-1, 1]
+    y_min = np.nanmin(pct)
+    y_max = np.nanmax(pct)
+    pad = (y_max - y_min) * padding
+    return [y_min - pad, y_max + pad]
+
+
+def summary(comparison):
+    """Start price, latest price and total return per symbol as a DataFrame."""
+    prices = comparison.prices
+    first = np.argmax(~np.isnan(prices), axis=0)
+    columns = np.arange(prices.shape[1])
+    start = prices[first, columns]
+    current = prices[-1, columns]
+    total = (current / start - 1) * 100
+    return pd.DataFrame({
+        "Symbol": comparison.symbols,
+        "Start Price": start,
+        "Current Price": current,
+        "Total Return": total,
+    })
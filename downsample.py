@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from choices import DEFAULT_MAX_POINTS
+
+
+def lttb_indices(y, n_out):
+    """Row positions kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into ``n_out - 2`` equal buckets and from each bucket we keep the
+    point forming the largest triangle with the point kept from the previous
+    bucket and the mean of the next bucket. X is taken as the row position,
+    which for trading days keeps weekends from skewing the triangles.
+    """
+    y = np.asarray(y, dtype=float)
+    return lttb_columns(y[:, None], n_out)[:, 0]
+
+
+def lttb_columns(y, n_out):
+    """LTTB applied to every column of a 2-D array at once.
+
+    Returns an ``(n_out, columns)`` array of row positions, one column of
+    picks per input column. The loop runs over buckets only, so hundreds of
+    series cost about as much as one.
+    """
+    y = np.asarray(y, dtype=float)
+    n, m = y.shape
+    if n_out >= n or n_out < 3:
+        return np.repeat(np.arange(n)[:, None], m, axis=1)
+
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    columns = np.arange(m)
+
+    # Mean of every bucket, used as the third corner of the triangle. NaNs
+    # (a series that starts late) are left out of the mean.
+    valid = ~np.isnan(y)
+    counts = np.add.reduceat(valid[:-1], edges[:-1], axis=0)
+    sums_y = np.add.reduceat(np.where(valid, y, 0)[:-1], edges[:-1], axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means_y = sums_y / counts
+    means_x = np.add.reduceat(x[:-1], edges[:-1]) / np.diff(edges)
+    means_x = np.append(means_x, x[-1])
+    means_y = np.vstack([means_y, y[-1]])
+
+    keep = np.empty((n_out, m), dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    prev = np.zeros(m, dtype=int)
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = means_x[i + 1], means_y[i + 1]
+        ax, ay = x[prev], y[prev, columns]
+        area = np.abs(
+            (ax - cx) * (y[lo:hi] - ay)
+            - (ax - x[lo:hi, None]) * (cy - ay)
+        )
+        area = np.where(np.isnan(area), -1.0, area)
+        prev = lo + np.argmax(area, axis=0)
+        keep[i + 1] = prev
+    return keep
+
+
+def lttb(series, n_out=DEFAULT_MAX_POINTS):
+    """Downsample a Series for a line chart, keeping its visual shape."""
+    if n_out is None or len(series) <= n_out:
+        return series
+    return series.iloc[lttb_indices(series.to_numpy(), n_out)]
+
+
+def bucket_ohlcv(data, n_out=DEFAULT_MAX_POINTS):
+    """Merge consecutive bars so at most ``n_out`` remain.
+
+    Each bucket keeps the first open, the highest high, the lowest low and
+    the last close, so no price extreme is lost. Volume keeps the largest
+    bar of the bucket, which preserves spikes without changing the scale
+    of the volume axis. Buckets are labelled with their first timestamp.
+    """
+    if n_out is None or len(data) <= n_out:
+        return data
+
+    n = len(data)
+    starts = np.unique(np.linspace(0, n, n_out, endpoint=False).astype(int))
+    ends = np.append(starts[1:], n) - 1
+
+    result = {}
+    if 'Open' in data:
+        result['Open'] = data['Open'].to_numpy()[starts]
+    if 'High' in data:
+        result['High'] = np.maximum.reduceat(data['High'].to_numpy(), starts)
+    if 'Low' in data:
+        result['Low'] = np.minimum.reduceat(data['Low'].to_numpy(), starts)
+    if 'Close' in data:
+        result['Close'] = data['Close'].to_numpy()[ends]
+    if 'Volume' in data:
+        result['Volume'] = np.maximum.reduceat(data['Volume'].to_numpy(), starts)
+    return pd.DataFrame(result, index=data.index[starts])
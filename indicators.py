@@ -0,0 +1,189 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from choices import PRESETS
+
+# func(bars, prev, **params) -> DataFrame indexed like bars
+#   bars: the new rows preceded by `context(params)` rows of history
+#   prev: last cached output row (state included) or None for a full run
+# Output columns starting with "_" carry state between runs and are hidden
+Indicator = namedtuple("Indicator", "func context overlay defaults")
+
+CACHE_SIZE = 512
+
+
+def _ewm(values, alpha, prev=None):
+    # Exponential recursion y[t] = a*x[t] + (1-a)*y[t-1]. Seeding the series
+    # with the previous output continues it exactly where the cache left off.
+    values = np.asarray(values, dtype=float)
+    if prev is None:
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    seeded = np.concatenate([[prev], values])
+    return pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def sma(bars, prev, window=20):
+    mean = bars["Close"].rolling(window).mean()
+    return pd.DataFrame({"SMA": mean}, index=bars.index)
+
+
+def ema(bars, prev, span=20):
+    alpha = 2.0 / (span + 1)
+    seed = None if prev is None else prev["EMA"]
+    return pd.DataFrame({"EMA": _ewm(bars["Close"], alpha, seed)}, index=bars.index)
+
+
+def bollinger(bars, prev, window=20, k=2.0):
+    rolling = bars["Close"].rolling(window)
+    mid = rolling.mean()
+    std = rolling.std(ddof=0)
+    return pd.DataFrame(
+        {"Middle": mid, "Upper": mid + k * std, "Lower": mid - k * std},
+        index=bars.index
+    )
+
+
+def vwap(bars, prev, window=20):
+    # Rolling rather than anchored, so the value at a date does not depend
+    # on how much history happens to be loaded
+    typical = (bars["High"] + bars["Low"] + bars["Close"]) / 3
+    pv = (typical * bars["Volume"]).rolling(window).sum()
+    volume = bars["Volume"].rolling(window).sum()
+    return pd.DataFrame({"VWAP": pv / volume.replace(0, np.nan)}, index=bars.index)
+
+
+def rsi(bars, prev, window=14):
+    # Wilder's smoothing; bars starts with one context row for the first delta
+    delta = bars["Close"].diff().to_numpy()[1:]
+    alpha = 1.0 / window
+    gain = _ewm(np.clip(delta, 0, None), alpha, None if prev is None else prev["_gain"])
+    loss = _ewm(np.clip(-delta, 0, None), alpha, None if prev is None else prev["_loss"])
+    start = 0 if prev is None else prev["_n"]
+    count = start + np.arange(1, len(delta) + 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100 - 100 / (1 + gain / loss)
+    # No losses means RSI 100, unless there were no gains either: a flat
+    # window is neutral
+    values = np.where(loss == 0, np.where(gain > 0, 100.0, 50.0), values)
+    values = np.where(count < window, np.nan, values)
+
+    result = pd.DataFrame(
+        {"RSI": values, "_gain": gain, "_loss": loss, "_n": count},
+        index=bars.index[1:]
+    )
+    if prev is None:
+        # The very first bar has no delta yet
+        first = pd.DataFrame({"RSI": [np.nan], "_gain": [np.nan], "_loss": [np.nan], "_n": [0]},
+                             index=bars.index[:1])
+        result = pd.concat([first, result])
+    return result
+
+
+def macd(bars, prev, fast=12, slow=26, signal=9):
+    close = bars["Close"]
+    fast_ema = _ewm(close, 2.0 / (fast + 1), None if prev is None else prev["_fast"])
+    slow_ema = _ewm(close, 2.0 / (slow + 1), None if prev is None else prev["_slow"])
+    line = fast_ema - slow_ema
+    signal_line = _ewm(line, 2.0 / (signal + 1), None if prev is None else prev["Signal"])
+    return pd.DataFrame(
+        {
+            "MACD": line,
+            "Signal": signal_line,
+            "Histogram": line - signal_line,
+            "_fast": fast_ema,
+            "_slow": slow_ema,
+        },
+        index=bars.index
+    )
+
+
+INDICATORS = {
+    "SMA": Indicator(sma, lambda p: p["window"] - 1, True, {"window": 20}),
+    "EMA": Indicator(ema, lambda p: 0, True, {"span": 20}),
+    "Bollinger": Indicator(bollinger, lambda p: p["window"] - 1, True, {"window": 20, "k": 2.0}),
+    "VWAP": Indicator(vwap, lambda p: p["window"] - 1, True, {"window": 20}),
+    "RSI": Indicator(rsi, lambda p: 1, False, {"window": 14}),
+    "MACD": Indicator(macd, lambda p: 0, False, {"fast": 12, "slow": 26, "signal": 9}),
+}
+
+
+def _public(result):
+    return result[[col for col in result.columns if not col.startswith("_")]]
+
+
+def compute(name, data, **params):
+    """Compute indicator ``name`` over the whole of ``data`` in one pass."""
+    spec = INDICATORS[name]
+    params = {**spec.defaults, **params}
+    return _public(spec.func(data, None, **params))
+
+
+class IndicatorCache:
+    """Indicator results per (key, indicator, parameters), extended in place.
+
+    When the bars passed in are the cached bars plus newer ones, only the
+    new rows are computed: rolling indicators look back ``context`` rows and
+    exponential ones resume from the saved state. The last cached row is
+    always recomputed because it may have been a partial session. Anything
+    else, such as rewritten history after a dividend adjustment, falls back
+    to a full run.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _extend(self, spec, params, data, cached):
+        n = len(cached)
+        if n < 2 or len(data) < n:
+            return None
+        # The bars up to the second to last cached row must be unchanged
+        if data.index[0] != cached.index[0] or data.index[n - 2] != cached.index[-2]:
+            return None
+        if data["Close"].iloc[n - 2] != cached["_close"].iloc[-2]:
+            return None
+
+        start = n - 1
+        context = spec.context(params)
+        bars = data.iloc[max(0, start - context):]
+        new = spec.func(bars, cached.iloc[-2], **params).iloc[-(len(data) - start):]
+        new = new.assign(_close=data["Close"].iloc[start:].to_numpy())
+        return pd.concat([cached.iloc[:-1], new])
+
+    def get(self, key, name, data, **params):
+        spec = INDICATORS[name]
+        params = {**spec.defaults, **params}
+        entry_key = (key, name, tuple(sorted(params.items())))
+
+        with self._lock:
+            cached = self._entries.get(entry_key)
+
+        result = None
+        if cached is not None:
+            if len(cached) == len(data) and cached.index[-1] == data.index[-1] \
+                    and cached["_close"].iloc[-1] == data["Close"].iloc[-1]:
+                result = cached
+            else:
+                result = self._extend(spec, params, data, cached)
+        if result is None:
+            result = spec.func(data, None, **params).assign(_close=data["Close"].to_numpy())
+
+        with self._lock:
+            self._entries[entry_key] = result
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return _public(result)
+
+
+_cache = IndicatorCache()
+
+
+def cached_indicator(key, name, data, **params):
+    """Indicator ``name`` over ``data`` through the process-wide cache."""
+    return _cache.get(key, name, data, **params)
@@ -0,0 +1,245 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+import columnar
+from periods import covering_period, period_start, slice_period
+from providers import get_provider
+from shared_cache import INFO_TTL, UPSTREAM_CONCURRENCY
+from store import OHLCVStore, default_path
+
+# Minimum age of the stored tail before we ask upstream for newer bars
+REFRESH_INTERVAL = float(os.environ.get("CHARTING_REFRESH_SECONDS", 15 * 60))
+
+# Upper bound on concurrent upstream fetches across all sessions
+FETCH_WORKERS = int(os.environ.get("CHARTING_FETCH_WORKERS", 16))
+# Per-request timeout handed to the provider, in seconds
+FETCH_TIMEOUT = float(os.environ.get("CHARTING_FETCH_TIMEOUT", 10))
+
+_store = None
+_executor = None
+# (store path, symbol) -> (refreshed_at, full stored frame, memory-mapped when possible)
+_frames = {}
+# (store path, symbol) -> lock held while that symbol is refreshed and read
+_symbol_locks = {}
+_symbol_locks_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = OHLCVStore(default_path(get_provider().name))
+    return _store
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+    return _executor
+
+
+def _symbol_lock(store, symbol):
+    with _symbol_locks_lock:
+        return _symbol_locks.setdefault((store.path, symbol), threading.Lock())
+
+
+def _has_corporate_action(data):
+    return any(
+        col in data.columns and (data[col] != 0).any()
+        for col in ("Dividends", "Stock Splits")
+    )
+
+
+def _changed(stored, tail):
+    # Whether the tail adds bars or revises any stored one. Prices are stored
+    # as float32, missing ones as NaN, and a missing volume as zero, so
+    # compare the way they are stored.
+    if tail.empty:
+        return False
+    if stored.empty or not tail.index.isin(stored.index).all():
+        return True
+    before = stored.loc[tail.index]
+    for col in ("Open", "High", "Low", "Close"):
+        if not np.array_equal(before[col].to_numpy(np.float32), tail[col].to_numpy(np.float32), equal_nan=True):
+            return True
+    volume = [frame["Volume"].fillna(0).to_numpy(np.int64) for frame in (before, tail)]
+    return not np.array_equal(*volume)
+
+
+def _refresh(symbol, fetch_period, store, timeout, provider, force=False):
+    """Bring the stored bars for ``symbol`` up to date, returning its meta row.
+
+    The first request downloads ``fetch_period`` in full. After that only the
+    bars from the last stored date onwards are fetched, and not more often
+    than ``REFRESH_INTERVAL`` unless ``force`` is set. A dividend or split in
+    the new tail means the adjusted history has moved, so the whole window
+    is downloaded again. A poll that brings nothing new only records the
+    poll time; ``refreshed_at``, which versions the stored bars, stays put.
+    """
+    start = period_start(fetch_period, provider.now())
+    meta = store.meta(symbol)
+
+    covered = (
+        meta is not None
+        and meta["covered_from"] is not None
+        and pd.Timestamp(meta["covered_from"]) <= start
+    )
+
+    if not covered:
+        data = provider.history(symbol, period=fetch_period, timeout=timeout)
+        if data.empty:
+            return None
+        store.replace(symbol, data, covered_from=start.date().isoformat())
+        return store.meta(symbol)
+
+    polled_at = meta["polled_at"] or meta["refreshed_at"]
+    stale = polled_at is None or time.time() - polled_at >= REFRESH_INTERVAL
+    if force or stale:
+        stored = _frame(symbol, store, meta)
+        last = stored.index[-1] if not stored.empty else start
+        # Refetch the last stored bar too, it may have been a partial session
+        try:
+            tail = provider.history(symbol, start=last.strftime("%Y-%m-%d"), timeout=timeout)
+        except Exception:
+            # Upstream hiccup: serve what we have and retry on the next request
+            tail = None
+        if tail is not None:
+            new = tail[tail.index > last] if not stored.empty else tail
+            if _has_corporate_action(new):
+                store.invalidate(symbol)
+                return _refresh(symbol, fetch_period, store, timeout, provider)
+            if not _changed(stored, tail):
+                store.mark_polled(symbol)
+                return store.meta(symbol)
+            store.upsert(symbol, tail)
+            store.mark_refreshed(symbol)
+            meta = store.meta(symbol)
+            # Patch the in-memory copy rather than reloading the whole window
+            kept = stored[stored.index < tail.index[0]] if not tail.empty else stored
+            merged = pd.concat([kept, tail.reindex(columns=stored.columns, fill_value=0)])
+            _frames[(store.path, symbol)] = (meta["refreshed_at"], _publish(symbol, store, meta, merged))
+
+    return meta
+
+
+def _publish(symbol, store, meta, data):
+    # Write the compact column files for this refresh and serve the mapping
+    root = columnar.columns_dir(store.path)
+    try:
+        columnar.write(root, symbol, meta["refreshed_at"], data)
+    except OSError:
+        return data
+    mapped = columnar.load(root, symbol, meta["refreshed_at"], meta["tz"])
+    return data if mapped is None else mapped
+
+
+def _frame(symbol, store, meta):
+    # Reuse the in-memory copy until the store has been refreshed again. The
+    # frame is memory-mapped from the column files, which another process
+    # may already have written for this refresh.
+    key = (store.path, symbol)
+    cached = _frames.get(key)
+    if cached is not None and cached[0] == meta["refreshed_at"]:
+        return cached[1]
+    data = columnar.load(columnar.columns_dir(store.path), symbol, meta["refreshed_at"], meta["tz"])
+    if data is None:
+        data = _publish(symbol, store, meta, store.load(symbol))
+    _frames[key] = (meta["refreshed_at"], data)
+    return data
+
+
+def load_history(symbol, period, store=None, timeout=FETCH_TIMEOUT, provider=None, force_refresh=False):
+    """Daily bars for ``symbol`` over ``period``, served from the local store.
+
+    Every period up to ``SUPERSET_PERIOD`` is a slice of the same stored
+    window, so switching between them needs no upstream request and, once
+    the window is in memory, no disk read either. ``force_refresh`` asks
+    upstream for new bars even if the last refresh was recent.
+    """
+    store = store or get_store()
+    provider = provider or get_provider()
+    now = provider.now()
+
+    # One session refreshes a symbol at a time; the others then find it
+    # up to date rather than rewriting the bars it is reading
+    with _symbol_lock(store, symbol):
+        meta = _refresh(symbol, covering_period(period, now), store, timeout, provider, force_refresh)
+        if meta is None:
+            return pd.DataFrame()
+        data = _frame(symbol, store, meta)
+    return slice_period(data, period, now)
+
+
+def load_histories(symbols, period, store=None, timeout=FETCH_TIMEOUT, deadline=None, provider=None):
+    """Load several symbols concurrently on the shared fetch pool.
+
+    Returns ``(frames, errors)``: frames maps each symbol that produced data
+    to its history, errors maps every other symbol to a message. Symbols
+    still outstanding after ``deadline`` seconds (by default enough for
+    every fetch to use its full ``timeout``, queued behind the upstream
+    concurrency limit) are reported as timed out rather than holding up
+    the rest.
+    """
+    if deadline is None:
+        waves = -(-len(symbols) // min(FETCH_WORKERS, UPSTREAM_CONCURRENCY))
+        deadline = timeout * 2 * max(waves, 1)
+
+    executor = get_executor()
+    futures = {
+        executor.submit(load_history, symbol, period, store, timeout, provider): symbol
+        for symbol in dict.fromkeys(symbols)
+    }
+    done, pending = wait(futures, timeout=deadline)
+
+    frames, errors = {}, {}
+    for future in done:
+        symbol = futures[future]
+        try:
+            data = future.result()
+        except Exception as e:
+            errors[symbol] = str(e)
+            continue
+        if data.empty:
+            errors[symbol] = "no data"
+        else:
+            frames[symbol] = data
+    for future in pending:
+        future.cancel()
+        errors[futures[future]] = "timed out"
+
+    # Keep the caller's ordering
+    frames = {symbol: frames[symbol] for symbol in symbols if symbol in frames}
+    return frames, errors
+
+
+def load_info(symbol, store=None, provider=None):
+    """Company metadata for ``symbol``, kept in the store for ``INFO_TTL``.
+
+    Name, sector and market cap barely move, so they are only asked for
+    again once the stored copy has expired, and a stale copy is served if
+    that request fails.
+    """
+    store = store or get_store()
+    provider = provider or get_provider()
+
+    stored = store.load_info(symbol)
+    if stored is not None and time.time() - stored[1] < INFO_TTL:
+        return stored[0]
+    try:
+        info = provider.info(symbol)
+    except Exception:
+        if stored is None:
+            raise
+        return stored[0]
+    store.save_info(symbol, info)
+    return info
+
+
+def load_info_async(symbol, store=None, provider=None):
+    """Start ``load_info`` on the shared fetch pool and return its future."""
+    return get_executor().submit(load_info, symbol, store, provider)
@@ -0,0 +1,158 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+# JSON lines, one record per chart draw
+LOG_PATH = os.environ.get("CHARTING_PERF_LOG")
+# Prometheus textfile-collector output, rewritten after every draw
+PROM_PATH = os.environ.get("CHARTING_PERF_PROM")
+# Samples kept per (view, phase) for the p50/p95 summaries
+WINDOW = 1000
+
+PHASES = ("fetch", "transform", "build", "serialize", "render")
+
+log = logging.getLogger(__name__)
+logger = logging.getLogger("charting.perf")
+if LOG_PATH and not logger.handlers:
+    _handler = logging.FileHandler(LOG_PATH)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_samples = defaultdict(lambda: deque(maxlen=WINDOW))
+_totals = defaultdict(lambda: [0, 0.0])
+_lock = threading.Lock()
+
+
+def exporting():
+    return bool(LOG_PATH or PROM_PATH)
+
+
+def _points(trace):
+    for attr in ("y", "x", "close"):
+        values = getattr(trace, attr, None)
+        if values is not None:
+            return len(values)
+    return 0
+
+
+class PhaseTimer:
+    """Wall-clock time per phase of one chart draw.
+
+    Call ``lap(phase)`` after each step: the time since the previous lap is
+    added to ``phase``. ``figure`` serializes a figure the way
+    ``st.plotly_chart`` will, timing it as ``serialize`` and recording its
+    payload size, trace count and point count. When disabled every method
+    is a no-op, so the figures are not serialized twice. With ``export``
+    off the finished record is only returned, not logged or exported.
+    """
+
+    def __init__(self, view, enabled=True, export=True):
+        self.view = view
+        self.enabled = enabled
+        self.export = export
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.figures = []
+        self.started = self._last = time.perf_counter()
+
+    def lap(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def figure(self, name, fig):
+        if not self.enabled:
+            return
+        self.lap("build")
+        payload = fig.to_json()
+        self.lap("serialize")
+        self.figures.append({
+            "name": name,
+            "traces": len(fig.data),
+            "points": sum(_points(trace) for trace in fig.data),
+            "bytes": len(payload.encode("utf-8")),
+        })
+
+    def finish(self, **labels):
+        """Close the record, export it and return it, or None when disabled."""
+        if not self.enabled:
+            return None
+        record = {
+            "ts": time.time(),
+            "view": self.view,
+            **labels,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "phases_ms": {phase: round(seconds * 1000, 2) for phase, seconds in self.phases.items()},
+            "figures": self.figures,
+            "payload_bytes": sum(f["bytes"] for f in self.figures),
+        }
+        if self.export:
+            try:
+                _export(record)
+            except Exception as e:
+                # Instrumentation must never fail the draw it measures
+                log.warning("could not export phase timings: %s", e)
+        return record
+
+
+def _export(record):
+    if LOG_PATH:
+        logger.info(json.dumps(record, default=str))
+    if not PROM_PATH:
+        return
+
+    with _lock:
+        view = record["view"]
+        for phase, ms in list(record["phases_ms"].items()) + [("total", record["total_ms"])]:
+            key = (view, phase)
+            _samples[key].append(ms / 1000)
+            _totals[key][0] += 1
+            _totals[key][1] += ms / 1000
+        payload_key = (view, "payload_bytes")
+        _totals[payload_key][0] += 1
+        _totals[payload_key][1] += record["payload_bytes"]
+        # Written and swapped in under the lock, through a temporary file of
+        # our own, so concurrent draws never move each other's file away
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(PROM_PATH)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(_prometheus_text())
+            # mkstemp creates it private, the collector may run as another user
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, PROM_PATH)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _prometheus_text():
+    lines = [
+        "# HELP charting_phase_seconds Time spent per phase of a chart draw.",
+        "# TYPE charting_phase_seconds summary",
+    ]
+    for (view, phase), samples in sorted(_samples.items()):
+        labels = f'view="{view}",phase="{phase}"'
+        values = np.fromiter(samples, dtype=float)
+        for q in (0.5, 0.95):
+            lines.append(f'charting_phase_seconds{{{labels},quantile="{q}"}} {np.quantile(values, q):.6f}')
+        count, total = _totals[(view, phase)]
+        lines.append(f"charting_phase_seconds_sum{{{labels}}} {total:.6f}")
+        lines.append(f"charting_phase_seconds_count{{{labels}}} {count}")
+
+    lines += [
+        "# HELP charting_payload_bytes_total Serialized figure bytes sent to the browser.",
+        "# TYPE charting_payload_bytes_total counter",
+    ]
+    for (view, name), (count, total) in sorted(_totals.items()):
+        if name == "payload_bytes":
+            lines.append(f'charting_payload_bytes_total{{view="{view}"}} {int(total)}')
+    return "\n".join(lines) + "\n"
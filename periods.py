@@ -0,0 +1,42 @@
+import pandas as pd
+
+# Widest window kept per symbol, every period offered in the UI is a slice of it
+SUPERSET_PERIOD = "5y"
+
+
+def period_start(period, now=None):
+    """First calendar day covered by a yfinance period string such as ``"6mo"``."""
+    now = pd.Timestamp.now().normalize() if now is None else pd.Timestamp(now).normalize()
+    if now.tz is not None:
+        now = now.tz_localize(None)
+    if period == "ytd":
+        return now.replace(month=1, day=1)
+    if period.endswith("mo"):
+        return now - pd.DateOffset(months=int(period[:-2]))
+    if period.endswith("y"):
+        return now - pd.DateOffset(years=int(period[:-1]))
+    if period.endswith("d"):
+        return now - pd.Timedelta(days=int(period[:-1]))
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def covering_period(period, now=None):
+    """Period to download so that ``period`` can be served as a local slice."""
+    if period_start(period, now) < period_start(SUPERSET_PERIOD, now):
+        return period
+    return SUPERSET_PERIOD
+
+
+def slice_period(data, period, now=None):
+    """Rows of ``data`` that fall inside ``period`` counted back from ``now``.
+
+    ``data`` must be sorted by date. The result is a view, not a copy.
+    Empty input, such as the frame returned for an unknown symbol, is
+    returned unchanged.
+    """
+    if data.empty:
+        return data
+    start = period_start(period, now)
+    if data.index.tz is not None:
+        start = start.tz_localize(data.index.tz)
+    return data.iloc[data.index.searchsorted(start):]
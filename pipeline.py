@@ -0,0 +1,73 @@
+from collections import namedtuple
+
+from charts import indicator_figure, price_figure, volume_figure
+from compare import align_closes
+from downsample import DEFAULT_MAX_POINTS, bucket_ohlcv, lttb
+from indicators import INDICATORS, PRESETS, cached_indicator, compute
+from periods import slice_period
+from resample import resample_ohlcv
+
+# bars:        (bucketed) OHLCV bars to plot
+# line:        downsampled Close series for the Line Chart type, else None
+# overlays:    (frame, label) price-overlay indicators aligned with the plot
+# oscillators: (name, frame, label) indicators drawn in their own panel
+SingleView = namedtuple("SingleView", "bars line overlays oscillators")
+
+
+def chart_bars(history, period, interval, now=None, key=None):
+    """``history`` at ``interval`` and its slice for ``period``.
+
+    Both are returned because indicators are computed over the whole
+    history, so they are warmed up at the start of the period. A bar is
+    stamped with its first session, so the bar holding the first session
+    of the period is kept even when it opened before the period did.
+    """
+    chart_history = resample_ohlcv(history, interval, key=key)
+    data = slice_period(history, period, now)
+    if data.empty:
+        return chart_history, chart_history.iloc[:0]
+    first = max(chart_history.index.searchsorted(data.index[0], side="right") - 1, 0)
+    return chart_history, chart_history.iloc[first:]
+
+
+def single_view(view, chart_history, chart_type, indicator_labels=(),
+                max_points=DEFAULT_MAX_POINTS, key=None):
+    """Downsample the visible bars ``view`` and attach the indicators.
+
+    With a ``key`` indicators go through the process-wide incremental cache,
+    otherwise they are computed from scratch.
+    """
+    bars = bucket_ohlcv(view, max_points)
+    line = lttb(view['Close'], max_points) if chart_type == "Line Chart" else None
+
+    plot_index = line.index if line is not None else bars.index
+    overlays, oscillators = [], []
+    for label in indicator_labels:
+        name, params = PRESETS[label]
+        if key is None:
+            values = compute(name, chart_history, **params)
+        else:
+            values = cached_indicator(key, name, chart_history, **params)
+        values = values.reindex(plot_index)
+        if INDICATORS[name].overlay:
+            overlays.append((values, label))
+        else:
+            oscillators.append((name, values, label))
+    return SingleView(bars, line, overlays, oscillators)
+
+
+def single_figures(single, symbol, chart_type):
+    """Yield ``(name, figure)`` for the price, volume and oscillator panels.
+
+    Figures are built one at a time, so a caller can draw each before the
+    next is built.
+    """
+    yield "Price", price_figure(single.bars, symbol, chart_type, line=single.line, overlays=single.overlays)
+    yield "Volume", volume_figure(single.bars)
+    for name, values, label in single.oscillators:
+        yield label, indicator_figure(name, values, label)
+
+
+def comparison_closes(frames):
+    """Align the closes of a ``{symbol: bars}`` mapping into a ``compare.Comparison``."""
+    return align_closes({symbol: data['Close'] for symbol, data in frames.items()})
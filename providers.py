@@ -0,0 +1,163 @@
+import json
+import os
+import random
+import threading
+import time
+
+import pandas as pd
+
+from periods import period_start
+from shared_cache import CachingProvider
+
+
+class MarketDataProvider:
+    """Source of daily bars and company metadata.
+
+    ``history`` takes either a yfinance-style ``period`` (``"1mo"``, ``"ytd"``,
+    ...) or a ``start`` date and returns a frame indexed by timestamp with
+    Open/High/Low/Close/Volume columns, empty when the symbol is unknown.
+    ``info`` returns a dict shaped like ``yfinance.Ticker.info``.
+    """
+
+    name = "base"
+
+    def history(self, symbol, period=None, start=None, timeout=None):
+        raise NotImplementedError
+
+    def info(self, symbol):
+        raise NotImplementedError
+
+    def now(self):
+        return pd.Timestamp.now().normalize()
+
+
+def _ticker(symbol):
+    # yfinance and its HTTP stack take a while to import, so load them on the
+    # first request rather than with the app
+    import yfinance as yf
+    return yf.Ticker(symbol)
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def history(self, symbol, period=None, start=None, timeout=None):
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        if start is not None:
+            return _ticker(symbol).history(start=start, **kwargs)
+        return _ticker(symbol).history(period=period, **kwargs)
+
+    def info(self, symbol):
+        return _ticker(symbol).info
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serves recorded bars from ``<root>/<SYMBOL>.parquet`` or ``.csv``.
+
+    Company metadata comes from ``<root>/info.json`` (a mapping of symbol to
+    info dict) when present. Every call sleeps for ``latency`` seconds plus up
+    to ``jitter`` seconds drawn from a seeded generator, so runs are
+    repeatable. ``now`` pins the reference date used to resolve periods,
+    which keeps old fixtures meaningful; by default it is today.
+    """
+
+    name = "replay"
+
+    def __init__(self, root, latency=0.0, jitter=0.0, seed=0, now=None, tz="America/New_York"):
+        self.root = root
+        self.latency = latency
+        self.jitter = jitter
+        self.tz = tz
+        self._now = pd.Timestamp(now).normalize() if now is not None else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._info = None
+
+    def _delay(self):
+        if not self.latency and not self.jitter:
+            return
+        with self._lock:
+            extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+        time.sleep(self.latency + extra)
+
+    def _load(self, symbol):
+        with self._lock:
+            if symbol in self._frames:
+                return self._frames[symbol]
+
+        data = pd.DataFrame()
+        for ext in (".parquet", ".csv"):
+            path = os.path.join(self.root, symbol + ext)
+            if not os.path.exists(path):
+                continue
+            if ext == ".parquet":
+                data = pd.read_parquet(path)
+            else:
+                data = pd.read_csv(path, index_col=0)
+                data.index = pd.to_datetime(data.index, utc=True).tz_convert(self.tz)
+            data.index.name = "Date"
+            data = data.sort_index()
+            break
+
+        with self._lock:
+            self._frames[symbol] = data
+        return data
+
+    def now(self):
+        return self._now if self._now is not None else super().now()
+
+    def history(self, symbol, period=None, start=None, timeout=None):
+        self._delay()
+        data = self._load(symbol)
+        if data.empty:
+            return data.copy()
+
+        if start is None:
+            start = period_start(period, self.now())
+        start = pd.Timestamp(start)
+        if data.index.tz is not None and start.tz is None:
+            start = start.tz_localize(data.index.tz)
+        return data[data.index >= start].copy()
+
+    def info(self, symbol):
+        self._delay()
+        if self._info is None:
+            path = os.path.join(self.root, "info.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._info = json.load(f)
+            else:
+                self._info = {}
+        return dict(self._info.get(symbol, {}))
+
+
+_provider = None
+
+
+def get_provider():
+    """The process-wide provider, chosen with ``CHARTING_PROVIDER``.
+
+    ``replay`` reads fixtures from ``CHARTING_REPLAY_DIR`` and honours
+    ``CHARTING_REPLAY_LATENCY``, ``CHARTING_REPLAY_JITTER`` and
+    ``CHARTING_REPLAY_NOW``; anything else uses yfinance. Either way it is
+    wrapped in a ``CachingProvider`` shared by every session.
+    """
+    global _provider
+    if _provider is None:
+        if os.environ.get("CHARTING_PROVIDER", "yfinance") == "replay":
+            provider = ReplayProvider(
+                os.environ.get("CHARTING_REPLAY_DIR", "fixtures"),
+                latency=float(os.environ.get("CHARTING_REPLAY_LATENCY", 0)),
+                jitter=float(os.environ.get("CHARTING_REPLAY_JITTER", 0)),
+                now=os.environ.get("CHARTING_REPLAY_NOW"),
+            )
+        else:
+            provider = YFinanceProvider()
+        _provider = CachingProvider(provider)
+    return _provider
+
+
+def set_provider(provider):
+    global _provider
+    _provider = provider
@@ -0,0 +1,217 @@
+"""Render chart packs for a watchlist without the Streamlit UI.
+
+    python report.py watchlist.txt --out reports/ --period 1y --indicators "SMA 50" "RSI 14"
+
+The watchlist holds one symbol per line or comma-separated symbols; blank
+lines and ``#`` comments are skipped. Every symbol gets the Single Symbol
+figures, and the whole list gets one comparison figure, written as
+standalone HTML and/or Plotly JSON. Bars are refreshed once into the
+shared store by this process, then rendered in parallel by a pool of
+worker processes that read them back from the store.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from charts import comparison_figure
+from choices import CHART_TYPES, DEFAULT_MAX_POINTS, INTERVALS, PRESETS
+from columnar import file_name
+from compare import summary
+from market_data import load_histories, load_history
+from periods import covering_period
+from perf import PhaseTimer
+from pipeline import chart_bars, comparison_closes, single_figures, single_view
+from providers import get_provider
+
+FORMATS = ("html", "json")
+
+ReportOptions = namedtuple(
+    "ReportOptions",
+    "out_dir period chart_type interval indicators max_points formats plotlyjs"
+)
+
+
+def read_watchlist(path):
+    """Symbols in ``path``, upper-cased and de-duplicated in file order."""
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            symbols += [s.strip().upper() for s in line.split(",") if s.strip()]
+    return list(dict.fromkeys(symbols))
+
+
+def _write(options, name, title, figures):
+    """Write ``[(label, figure)]`` in every requested format, returning the bytes written."""
+    written = 0
+    base = os.path.join(options.out_dir, file_name(name))
+    if "html" in options.formats:
+        parts = [
+            pio.to_html(fig, full_html=False, include_plotlyjs=options.plotlyjs if i == 0 else False)
+            for i, (label, fig) in enumerate(figures)
+        ]
+        html = (
+            f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title></head>\n"
+            f"<body>\n{''.join(parts)}\n</body></html>\n"
+        )
+        with open(base + ".html", "w", encoding="utf-8") as f:
+            written += f.write(html)
+    if "json" in options.formats:
+        payload = ", ".join(f"{json.dumps(label)}: {fig.to_json()}" for label, fig in figures)
+        text = f'{{"title": {json.dumps(title)}, "figures": {{{payload}}}}}\n'
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            written += f.write(text)
+    return written
+
+
+def render_symbol(symbol, options):
+    """Build and write the Single Symbol figures for ``symbol``.
+
+    Runs in a worker process. The bars were refreshed by the parent, so
+    ``load_history`` is served from the store without an upstream request.
+    Timings are returned to the parent for ``timings.csv`` rather than
+    exported, as every worker would overwrite the others' textfile.
+    """
+    timer = PhaseTimer("report", export=False)
+    provider = get_provider()
+    history = load_history(symbol, covering_period(options.period, provider.now()))
+    timer.lap("fetch")
+    if history.empty:
+        return timer.finish(symbol=symbol, error="no data")
+
+    chart_history, chart_data = chart_bars(history, options.period, options.interval, provider.now())
+    single = single_view(chart_data, chart_history, options.chart_type, options.indicators, options.max_points)
+    timer.lap("transform")
+
+    figures = list(single_figures(single, symbol, options.chart_type))
+    timer.lap("build")
+    written = _write(options, symbol, f"{symbol} - {options.period}", figures)
+    timer.lap("serialize")
+    return timer.finish(symbol=symbol, bars=len(single.bars), bytes=written)
+
+
+def render_comparison(frames, options):
+    """Build and write the comparison figure and summary for ``{symbol: bars}``."""
+    timer = PhaseTimer("report", export=False)
+    comparison = comparison_closes(frames)
+    timer.lap("transform")
+
+    figures = [("Comparison", comparison_figure(comparison, max_points=options.max_points))]
+    timer.lap("build")
+    written = _write(options, "comparison", f"Symbol Performance Comparison - {options.period}", figures)
+    summary(comparison).to_csv(os.path.join(options.out_dir, "comparison-summary.csv"), index=False)
+    timer.lap("serialize")
+    return timer.finish(symbol="(comparison)", bars=len(comparison.index), bytes=written)
+
+
+def _interval(value):
+    if value in INTERVALS:
+        return value
+    try:
+        days = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected one of {', '.join(INTERVALS)} or a number of trading days")
+    if days < 1:
+        raise argparse.ArgumentTypeError("trading days per bar must be at least 1")
+    return days
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render chart packs for a watchlist.")
+    parser.add_argument("watchlist", help="file with one symbol per line or comma-separated")
+    parser.add_argument("--out", default="reports", help="output directory (default: reports)")
+    parser.add_argument("--period", default="1y", help="period such as 1mo, ytd, 1y, 5y (default: 1y)")
+    parser.add_argument("--chart-type", default="Candlestick", choices=CHART_TYPES)
+    parser.add_argument("--interval", default="Daily", type=_interval,
+                        help=f"{', '.join(INTERVALS)} or trading days per bar (default: Daily)")
+    parser.add_argument("--indicators", nargs="*", default=[], choices=list(PRESETS), metavar="INDICATOR",
+                        help=f"any of: {', '.join(PRESETS)}")
+    parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS,
+                        help="downsample longer series, 0 keeps every point")
+    parser.add_argument("--format", nargs="+", default=["html"], choices=FORMATS, dest="formats")
+    parser.add_argument("--plotlyjs", default="directory", choices=["directory", "cdn", "inline"],
+                        help="how HTML files load plotly.js (default: one shared copy in the output directory)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="render processes")
+    parser.add_argument("--no-comparison", action="store_true", help="skip the comparison figure")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    symbols = read_watchlist(args.watchlist)
+    os.makedirs(args.out, exist_ok=True)
+
+    plotlyjs = True if args.plotlyjs == "inline" else args.plotlyjs
+    if plotlyjs == "directory" and "html" in args.formats:
+        with open(os.path.join(args.out, "plotly.min.js"), "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+
+    options = ReportOptions(
+        out_dir=args.out,
+        period=args.period,
+        chart_type=args.chart_type,
+        interval=args.interval,
+        indicators=tuple(args.indicators),
+        max_points=args.max_points or None,
+        formats=tuple(args.formats),
+        plotlyjs=plotlyjs,
+    )
+
+    started = time.perf_counter()
+    # Refresh every symbol once here, the workers then only read the store
+    frames, errors = load_histories(symbols, args.period)
+    for symbol, reason in errors.items():
+        print(f"skipping {symbol}: {reason}")
+    fetched = time.perf_counter()
+
+    records = []
+    # Fresh interpreters rather than forks of a process running fetch threads
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as pool:
+        futures = {}
+        if len(frames) > 1 and not args.no_comparison:
+            # Only the closes are needed, keep what is pickled to the worker small
+            closes = {symbol: data[["Close"]] for symbol, data in frames.items()}
+            futures[pool.submit(render_comparison, closes, options)] = "(comparison)"
+        for symbol in frames:
+            futures[pool.submit(render_symbol, symbol, options)] = symbol
+        for future in as_completed(futures):
+            try:
+                records.append(future.result())
+            except Exception as e:
+                print(f"failed {futures[future]}: {e}")
+
+    if records:
+        _print_summary(records, args.out)
+    print(
+        f"{len(records)} reports in {time.perf_counter() - started:.1f} s "
+        f"(fetch {fetched - started:.1f} s, {args.workers} workers), "
+        f"{len(errors)} symbols skipped"
+    )
+
+
+def _print_summary(records, out_dir):
+    rows = pd.DataFrame([
+        {"symbol": r["symbol"], **r["phases_ms"], "total": r["total_ms"], "KB": r.get("bytes", 0) / 1024}
+        for r in records
+    ]).set_index("symbol")
+    rows = rows.loc[:, (rows != 0).any()].sort_values("total", ascending=False)
+    rows.to_csv(os.path.join(out_dir, "timings.csv"))
+
+    print("Slowest symbols (ms):")
+    print(rows.head(10).round(1).to_string())
+    print()
+    print("Per symbol (ms):")
+    print(rows.describe(percentiles=[0.5, 0.95]).loc[["mean", "50%", "95%", "max"]].round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
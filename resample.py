@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from choices import INTERVALS
+
+MEMO_SIZE = 256
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _group_starts(index, interval):
+    # Row positions where a new bar begins
+    n = len(index)
+    if isinstance(interval, int):
+        return np.arange(0, n, interval)
+
+    # Group on wall-clock dates so bars line up with the exchange calendar
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    days = index.values.astype("datetime64[D]").astype(np.int64)
+    if interval == "W":
+        # 1970-01-05 was a Monday, so weeks run Monday to Sunday
+        keys = (days - 4) // 7
+    elif interval == "M":
+        keys = index.values.astype("datetime64[M]").astype(np.int64)
+    else:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+
+
+def _aggregate(data, interval):
+    if interval == 1:
+        # Daily bars are passed through as they are, selecting columns would copy them
+        return data
+    if len(data) == 0:
+        return data[["Open", "High", "Low", "Close", "Volume"]]
+
+    starts = _group_starts(data.index, interval)
+    ends = np.append(starts[1:], len(data)) - 1
+    return pd.DataFrame(
+        {
+            "Open": data["Open"].to_numpy()[starts],
+            "High": np.maximum.reduceat(data["High"].to_numpy(), starts),
+            "Low": np.minimum.reduceat(data["Low"].to_numpy(), starts),
+            "Close": data["Close"].to_numpy()[ends],
+            "Volume": np.add.reduceat(data["Volume"].to_numpy(), starts),
+        },
+        index=data.index[starts]
+    )
+
+
+def resample_ohlcv(data, interval, key=None):
+    """Aggregate daily bars into weekly, monthly or N-trading-day bars.
+
+    ``interval`` is a label from ``INTERVALS`` or a positive number of
+    trading days. Each bar takes the first open, highest high, lowest low,
+    last close and total volume of its days and is stamped with the date of
+    its first session. Results are memoized per ``key`` (usually the symbol)
+    and the shape of ``data``, so a tail refresh invalidates them.
+    """
+    interval = INTERVALS.get(interval, interval)
+    if isinstance(interval, (int, np.integer)):
+        interval = int(interval)
+        if interval < 1:
+            raise ValueError(f"Interval must be at least one day, got {interval}")
+
+    if key is None or len(data) == 0:
+        return _aggregate(data, interval)
+
+    memo_key = (key, interval, len(data), data.index[0], data.index[-1], data["Close"].iloc[-1])
+    with _memo_lock:
+        if memo_key in _memo:
+            _memo.move_to_end(memo_key)
+            return _memo[memo_key]
+
+    result = _aggregate(data, interval)
+    with _memo_lock:
+        _memo[memo_key] = result
+        if len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return result
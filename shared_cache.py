@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Seconds a full history download stays shared; the on-disk store keeps it longer
+HISTORY_TTL = float(os.environ.get("CHARTING_HISTORY_TTL", 60))
+# Seconds an incremental (start date) fetch stays shared, at most the live-mode interval
+TAIL_TTL = float(os.environ.get("CHARTING_TAIL_TTL", 5))
+# Seconds company metadata stays shared, it rarely changes
+INFO_TTL = float(os.environ.get("CHARTING_INFO_TTL", 24 * 60 * 60))
+# Entries per cache before the least recently used one is evicted
+CACHE_SIZE = int(os.environ.get("CHARTING_CACHE_SIZE", 1024))
+# Upstream calls allowed in flight at once across the whole process
+UPSTREAM_CONCURRENCY = int(os.environ.get("CHARTING_UPSTREAM_CONCURRENCY", 8))
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire after ``ttl`` seconds.
+
+    Once ``maxsize`` entries are held, the least recently used one is
+    dropped to make room.
+    """
+
+    def __init__(self, ttl, maxsize=CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers share its result.
+
+    The first caller for a key runs ``fn`` and every caller that arrives
+    while it is running waits for the same outcome, value or exception.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class CachingProvider:
+    """Process-wide cache and request coalescing in front of a provider.
+
+    Every Streamlit session runs in the same process, so sessions asking
+    for the same symbol share one cache entry, and concurrent misses for
+    the same request share a single upstream call. At most
+    ``max_concurrent`` upstream calls run at once, whatever the number of
+    sessions. Unknown symbols (empty frames) are cached too. Cached frames
+    are shared between callers and must not be modified in place.
+    """
+
+    def __init__(self, provider, history_ttl=HISTORY_TTL, tail_ttl=TAIL_TTL, info_ttl=INFO_TTL,
+                 maxsize=CACHE_SIZE, max_concurrent=UPSTREAM_CONCURRENCY):
+        self.provider = provider
+        self.name = provider.name
+        self.tail_ttl = tail_ttl
+        self.history_cache = TTLCache(history_ttl, maxsize)
+        self.info_cache = TTLCache(info_ttl, maxsize)
+        self._flight = SingleFlight()
+        self._upstream = threading.BoundedSemaphore(max_concurrent)
+
+    def _cached(self, cache, key, fetch, ttl=None):
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def load():
+            # Another caller may have filled the entry while we queued
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            with self._upstream:
+                value = fetch()
+            cache.set(key, value, ttl)
+            return value
+
+        return self._flight.do(key, load)
+
+    def history(self, symbol, period=None, start=None, timeout=None):
+        key = ("history", symbol, period, str(start) if start is not None else None)
+        # Tail fetches back live updates, so they go stale much sooner
+        ttl = self.tail_ttl if start is not None else None
+        return self._cached(
+            self.history_cache,
+            key,
+            lambda: self.provider.history(symbol, period=period, start=start, timeout=timeout),
+            ttl
+        )
+
+    def info(self, symbol):
+        return self._cached(self.info_cache, ("info", symbol), lambda: self.provider.info(symbol))
+
+    def now(self):
+        return self.provider.now()
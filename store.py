@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+
+def default_path(provider_name="yfinance"):
+    # One file per provider so replayed fixtures never mix with live data
+    return os.environ.get(
+        "CHARTING_STORE",
+        os.path.join(CACHE_DIR, f"ohlcv-{provider_name}.sqlite")
+    )
+
+# Columns kept from a yfinance history frame, and their SQL names
+COLUMNS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+    "Dividends": "dividends",
+    "Stock Splits": "splits",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL,
+    volume INTEGER, dividends REAL, splits REAL,
+    PRIMARY KEY (symbol, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    symbol TEXT PRIMARY KEY,
+    tz TEXT,
+    covered_from TEXT,
+    refreshed_at REAL,
+    polled_at REAL
+);
+CREATE TABLE IF NOT EXISTS info (
+    symbol TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class OHLCVStore:
+    """Daily bars on disk in SQLite, one row per (symbol, timestamp).
+
+    Timestamps are stored as UTC epoch nanoseconds and the symbol's exchange
+    timezone is kept in ``meta`` so frames come back exactly as yfinance
+    returned them. Every call opens its own connection, which keeps the
+    store safe to use from several threads or processes at once.
+    """
+
+    def __init__(self, path=None):
+        path = path or default_path()
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Stores created before polled_at was tracked
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(meta)")]
+            if "polled_at" not in columns:
+                conn.execute("ALTER TABLE meta ADD COLUMN polled_at REAL")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, symbol, start=None):
+        meta = self.meta(symbol)
+        query = "SELECT ts, " + ", ".join(COLUMNS.values()) + " FROM bars WHERE symbol = ?"
+        params = [symbol]
+        if start is not None:
+            query += " AND ts >= ?"
+            params.append(pd.Timestamp(start).value)
+        query += " ORDER BY ts"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        frame = pd.DataFrame(rows, columns=["ts"] + list(COLUMNS))
+        index = pd.to_datetime(frame.pop("ts"), unit="ns", utc=True)
+        if meta and meta["tz"]:
+            index = index.dt.tz_convert(meta["tz"])
+        frame.index = pd.DatetimeIndex(index, name="Date")
+        return frame
+
+    def _write_bars(self, conn, symbol, data):
+        index = data.index
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        # No corporate action is a zero, but a missing price or volume stays
+        # NULL so the bar is drawn as a gap rather than at zero
+        frame = data.reindex(columns=list(COLUMNS)).fillna({"Dividends": 0.0, "Stock Splits": 0.0})
+        frame["Volume"] = frame["Volume"].astype("Int64")
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows = zip(
+            [symbol] * len(frame),
+            index.tz_convert("UTC").asi8.tolist(),
+            *(frame[col].tolist() for col in COLUMNS)
+        )
+        conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def upsert(self, symbol, data):
+        if data.empty:
+            return
+        with self._connect() as conn:
+            self._write_bars(conn, symbol, data)
+            conn.execute(
+                "INSERT INTO meta (symbol, tz) VALUES (?, ?) "
+                "ON CONFLICT(symbol) DO UPDATE SET tz = excluded.tz",
+                (symbol, str(data.index.tz) if data.index.tz is not None else None)
+            )
+
+    def replace(self, symbol, data, covered_from):
+        """Make ``data`` all of ``symbol``'s bars, covering ``covered_from`` on.
+
+        Old bars are dropped, the new ones written and the symbol marked
+        refreshed in a single transaction, so a concurrent reader sees
+        either the old window or the new one, never an empty symbol.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM bars WHERE symbol = ?", (symbol,))
+            self._write_bars(conn, symbol, data)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (symbol, tz, covered_from, refreshed_at, polled_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (symbol, str(data.index.tz) if data.index.tz is not None else None, covered_from, now, now)
+            )
+
+    def invalidate(self, symbol):
+        # Keep the bars but force the next request to download its window again
+        with self._connect() as conn:
+            conn.execute("UPDATE meta SET covered_from = NULL WHERE symbol = ?", (symbol,))
+
+    def meta(self, symbol):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT tz, covered_from, refreshed_at, polled_at FROM meta WHERE symbol = ?",
+                (symbol,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"tz": row[0], "covered_from": row[1], "refreshed_at": row[2], "polled_at": row[3]}
+
+    def mark_refreshed(self, symbol, covered_from=None):
+        # refreshed_at changes only when the stored bars do, it versions them
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO meta (symbol, covered_from, refreshed_at, polled_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(symbol) DO UPDATE SET refreshed_at = excluded.refreshed_at, "
+                "polled_at = excluded.polled_at, "
+                "covered_from = COALESCE(excluded.covered_from, meta.covered_from)",
+                (symbol, covered_from, now, now)
+            )
+
+    def mark_polled(self, symbol):
+        # Upstream was asked but had nothing new, the stored bars stand
+        with self._connect() as conn:
+            conn.execute("UPDATE meta SET polled_at = ? WHERE symbol = ?", (time.time(), symbol))
+
+    def load_info(self, symbol):
+        """Stored company metadata as ``(info, fetched_at)``, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, fetched_at FROM info WHERE symbol = ?",
+                (symbol,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def save_info(self, symbol, info):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO info VALUES (?, ?, ?)",
+                (symbol, json.dumps(info, default=str), time.time())
+            )